@@ -1,3 +1,13 @@
-from .client import api_client, IS57APIClient
+from .client import api_client, IS57APIClient, SetResultStatus
+from .matrix import ResultsMatrix
+from .models import Task, TaskIndex, Team
 
-__all__ = ["api_client", "IS57APIClient"]
+__all__ = [
+    "api_client",
+    "IS57APIClient",
+    "SetResultStatus",
+    "ResultsMatrix",
+    "Task",
+    "TaskIndex",
+    "Team",
+]
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from api.decoding import loads
+from api.models import decode_snapshot, encode_snapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEYS = ("teams", "tasks", "results")
+
+
+class ResultChange(NamedTuple):
+    """Изменение результата команды по заданию"""
+
+    team_id: int
+    task_id: int
+    old_value: Optional[int]
+    new_value: int
+    user_id: Optional[int] = None
+    source: str = "snapshot"  # snapshot - замечено в /results, bot - /s
+    timestamp: float = 0.0
+
+
+def diff_cells(
+    old: Dict[Tuple[int, int], int],
+    new: Dict[Tuple[int, int], int],
+    team_ids: Optional[Set[int]] = None,
+    task_ids: Optional[Set[int]] = None,
+) -> List[ResultChange]:
+    """Изменившиеся ячейки между двумя снимками результатов
+
+    /results разрежен: ячейки без баллов в нем нет, поэтому новая ячейка
+    - это первый результат (изменение с 0). Пропавшая ячейка удаленной
+    команды или задания изменением не считается, иначе удаление дало бы
+    по изменению на 0 для каждой ячейки. Удаленными считаются команды и
+    задания не из team_ids/task_ids (id из снимков /teams и /tasks), а
+    если они неизвестны - те, у которых в новом снимке нет ни одной
+    ячейки.
+    """
+    if team_ids is None:
+        team_ids = {team_id for team_id, _ in new}
+    if task_ids is None:
+        task_ids = {task_id for _, task_id in new}
+    now = time.time()
+    changes = []
+    for key in old.keys() | new.keys():
+        team_id, task_id = key
+        if key not in new and (
+            team_id not in team_ids or task_id not in task_ids
+        ):
+            continue
+        old_value = old.get(key, 0)
+        new_value = new.get(key, 0)
+        if old_value != new_value:
+            changes.append(
+                ResultChange(
+                    team_id, task_id, old_value, new_value, timestamp=now
+                )
+            )
+    return changes
+
+
+class Validators(NamedTuple):
+    """Валидаторы ответа: заголовки ETag/Last-Modified и хэш тела"""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None
+
+
+class ConditionalRequest:
+    """Условный запрос части снимка
+
+    Отправляет валидаторы прошлого ответа (If-None-Match,
+    If-Modified-Since) и считает хэш тела нового ответа. result - итог:
+    not_modified (ответ 304), unchanged (тело совпало по хэшу) или
+    changed.
+    """
+
+    def __init__(self, previous: Validators):
+        self.previous = previous
+        self.current = previous
+        self.result = "changed"
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.previous.etag:
+            headers["If-None-Match"] = self.previous.etag
+        if self.previous.last_modified:
+            headers["If-Modified-Since"] = self.previous.last_modified
+        return headers
+
+    def not_modified(self):
+        """Ответ 304: действуют прежние валидаторы"""
+        self.result = "not_modified"
+
+    def update(self, chunk: bytes):
+        """Учет очередной части тела ответа в хэше"""
+        self._hash.update(chunk)
+
+    def finish(self, headers) -> bool:
+        """Запоминание валидаторов ответа; True - тело не изменилось"""
+        self.current = Validators(
+            headers.get("ETag"),
+            headers.get("Last-Modified"),
+            self._hash.hexdigest(),
+        )
+        if self.current.digest == self.previous.digest:
+            self.result = "unchanged"
+        return self.result == "unchanged"
+
+
+class SnapshotCache:
+    """Кэш последнего известного снимка /teams, /tasks и /results
+
+    Данные считаются свежими ttl секунд после загрузки. Снимок можно
+    сохранить на диск и загрузить при старте: такие данные сразу
+    считаются устаревшими и отдаются только до первого обновления.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._values: Dict[str, Any] = {}
+        self._fetched_at: Dict[str, float] = {}
+        # Счетчик сбросов ключа: загрузка, начатая до сброса, не сохраняется
+        self._generations: Dict[str, int] = {}
+
+    def get(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Значение и признак его свежести"""
+        if key not in self._values:
+            return None, False
+        age = time.monotonic() - self._fetched_at.get(key, float("-inf"))
+        return self._values[key], age < self.ttl
+
+    def generation(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    def set(
+        self, key: str, value: Any, generation: Optional[int] = None
+    ) -> bool:
+        """Сохранение значения, если ключ не сбрасывался после generation"""
+        if generation is not None and generation != self.generation(key):
+            return False
+        self._values[key] = value
+        self._fetched_at[key] = time.monotonic()
+        return True
+
+    def touch(self, key: str, generation: int) -> bool:
+        """Продление свежести значения, если backend вернул то же самое"""
+        if key not in self._values or generation != self.generation(key):
+            return False
+        self._fetched_at[key] = time.monotonic()
+        return True
+
+    def patch(self, key: str, value: Any):
+        """Замена значения локальной правкой
+
+        Время загрузки не меняется, а загрузки, начатые до правки,
+        не перезапишут ее устаревшими данными.
+        """
+        self._values[key] = value
+        self._generations[key] = self.generation(key) + 1
+
+    def discard(self, key: str):
+        """Удаление значения: следующий запрос дождется загрузки"""
+        self._values.pop(key, None)
+        self._fetched_at.pop(key, None)
+        self._generations[key] = self.generation(key) + 1
+
+    def load(self) -> bool:
+        """Загрузка сохраненного снимка с диска"""
+        try:
+            if not os.path.exists(self.path):
+                return False
+            with open(self.path, "rb") as f:
+                data = loads(f.read())
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить снимок данных: {e}")
+            return False
+
+        for key in SNAPSHOT_KEYS:
+            if key in data and key not in self._values:
+                self._values[key] = decode_snapshot(key, data[key])
+        return True
+
+    def save(self):
+        """Сохранение снимка на диск (блокирующий вызов)"""
+        data = {
+            k: encode_snapshot(k, self._values[k])
+            for k in SNAPSHOT_KEYS
+            if k in self._values
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить снимок данных: {e}")
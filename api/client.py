@@ -1,10 +1,73 @@
 import aiohttp
+import asyncio
+import enum
 import logging
-from typing import Optional, List, Dict
-from config.settings import IS57_API_BASE_URL
+import time
+from typing import Any, Awaitable, Callable, Optional, List, Dict, Set, Tuple
+from config.settings import (
+    HEDGE_BUDGET,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    HEDGE_WINDOW,
+    IS57_API_BASE_URL,
+    SNAPSHOT_FILE,
+    SNAPSHOT_TTL,
+)
+from api.matrix import ResultsMatrix
+from api.cache import (
+    ConditionalRequest,
+    ResultChange,
+    SnapshotCache,
+    SNAPSHOT_KEYS,
+    Validators,
+    diff_cells,
+)
+from api.decoding import ResultsStreamParser, loads
+from api.hedging import HedgePolicy
+from api.writes import KeyedWriteQueue, suppressed_writes
+from api.models import Results, Task, TaskIndex, Team, decode_snapshot
+from utils.deadline import deadline_var, remaining
+from utils.lifecycle import in_flight
+from utils.logging_setup import user_id_var
+from utils.metrics import (
+    backend_errors,
+    backend_invalid_token,
+    backend_latency,
+    metrics,
+    record_cache_access,
+)
+from utils.trace import trace_recorder
 
 logger = logging.getLogger(__name__)
 
+reconcile_mismatches = metrics.counter(
+    "is57bot_cache_reconcile_mismatches_total",
+    "Расхождения локальных правок кэша с данными backend",
+    ["key"],
+)
+snapshot_refreshes = metrics.counter(
+    "is57bot_snapshot_refreshes_total",
+    "Загрузки частей снимка по итогу: changed, unchanged, not_modified",
+    ["key", "result"],
+)
+
+# Ответ на условный запрос не изменился с прошлой загрузки
+NOT_MODIFIED = object()
+
+
+class SetResultStatus(enum.Enum):
+    """Итог установки результата (истинно, если значение установлено)"""
+
+    FAILED = "failed"
+    SET = "set"
+    # Значение уже было установлено - запрос в backend не отправлялся
+    UNCHANGED = "unchanged"
+    # Пока запрос ждал очереди, для ячейки пришло более новое значение
+    SUPERSEDED = "superseded"
+
+    def __bool__(self) -> bool:
+        return self is not SetResultStatus.FAILED
+
 
 class IS57APIClient:
     """Клиент для работы с API is57.ru"""
@@ -12,6 +75,36 @@ class IS57APIClient:
     def __init__(self):
         self.base_url = IS57_API_BASE_URL
         self.session: Optional[aiohttp.ClientSession] = None
+        self.cache = SnapshotCache(SNAPSHOT_FILE, SNAPSHOT_TTL)
+        # Дублирование медленных запросов снимка (только чтение)
+        self.hedging = HedgePolicy(
+            HEDGE_PERCENTILE, HEDGE_BUDGET, HEDGE_WINDOW, HEDGE_MIN_SAMPLES
+        )
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Валидаторы последнего ответа, сохраненного в кэш, по ключам
+        self._validators: Dict[str, Validators] = {}
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_again = False
+        # Последние известные значения ячеек результатов для поиска изменений
+        self._known_cells: Optional[Dict[Tuple[int, int], int]] = None
+        self._listener_tasks: Set[asyncio.Task] = set()
+        self._results_listeners: List[
+            Callable[[List[ResultChange]], Awaitable[None]]
+        ] = []
+        # Ожидаемое состояние после локальных правок кэша, проверяется
+        # при следующей загрузке с backend:
+        # results - {(team_id, task_id): баллы}, teams/tasks - {id: есть ли}
+        self._expected: Dict[str, Dict] = {key: {} for key in SNAPSHOT_KEYS}
+        # Запросы установки результата по ячейкам (команда, задание)
+        self._cell_writes = KeyedWriteQueue(SetResultStatus.SUPERSEDED)
+        # Матрица результатов и снимок, по которому она построена
+        self._matrix: Optional[ResultsMatrix] = None
+        self._matrix_source: Tuple = (None, None, None)
+        # Индекс заданий по предметам и список, по которому он построен
+        self._task_index: Optional[TaskIndex] = None
+        self._task_index_source: Optional[List[Task]] = None
+        # Когда (time.monotonic) backend последний раз ответил успешно
+        self.last_success: Optional[float] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Получение или создание HTTP сессии"""
@@ -25,116 +118,524 @@ class IS57APIClient:
             await self.session.close()
 
     async def _make_request(
-        self, endpoint: str, params: Optional[Dict] = None
-    ) -> Optional[Dict]:
-        """Выполнение HTTP запроса к API"""
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        stream: Optional[ResultsStreamParser] = None,
+        conditional: Optional[ConditionalRequest] = None,
+    ) -> Optional[Any]:
+        """Выполнение HTTP запроса к API
+
+        JSON разбирается прямо из байтов ответа; со stream тело
+        передается потоковому парсеру по мере получения. С conditional
+        запрос условный: если ответ не изменился, возвращается
+        NOT_MODIFIED, а тело не разбирается. Внутри команды таймаут
+        запроса - время, оставшееся до ее дедлайна.
+        """
+        start = time.perf_counter()
         try:
             session = await self._get_session()
             url = f"{self.base_url}{endpoint}"
 
-            async with session.get(url, params=params) as response:
+            kwargs: Dict[str, Any] = {"params": params}
+            if conditional is not None:
+                kwargs["headers"] = conditional.headers()
+            budget = remaining()
+            if budget is not None:
+                if budget <= 0:
+                    backend_errors.inc(endpoint=endpoint, reason="deadline")
+                    return None
+                kwargs["timeout"] = aiohttp.ClientTimeout(total=budget)
+
+            async with session.get(url, **kwargs) as response:
+                logger.debug(
+                    f"GET {endpoint} -> {response.status} "
+                    f"({time.perf_counter() - start:.3f}s)"
+                )
+                if response.status in (200, 304):
+                    self.last_success = time.monotonic()
+
+                def trace(body=None):
+                    trace_recorder.record_backend(
+                        endpoint,
+                        params,
+                        response.status,
+                        response.content_type,
+                        body,
+                        time.perf_counter() - start,
+                    )
+
+                if response.status == 304 and conditional is not None:
+                    trace()
+                    conditional.not_modified()
+                    return NOT_MODIFIED
                 if response.status == 200:
                     if response.content_type == "application/json":
-                        return await response.json()
+                        if stream is None:
+                            body = await response.read()
+                            trace(body)
+                            if conditional is not None:
+                                conditional.update(body)
+                                if conditional.finish(response.headers):
+                                    return NOT_MODIFIED
+                            return loads(body)
+                        # Для трассы тело собирается целиком
+                        chunks = [] if trace_recorder.enabled else None
+                        async for chunk in response.content.iter_any():
+                            if conditional is not None:
+                                conditional.update(chunk)
+                            if chunks is not None:
+                                chunks.append(chunk)
+                            stream.feed(chunk)
+                        if chunks is not None:
+                            trace(b"".join(chunks))
+                        if conditional is not None and conditional.finish(
+                            response.headers
+                        ):
+                            return NOT_MODIFIED
+                        return stream.close()
                     else:
                         text = await response.text()
+                        trace(text)
                         if text == "invalid token":
+                            backend_invalid_token.inc(endpoint=endpoint)
                             return {"error": "invalid token"}
                         return {"result": text}
                 else:
+                    trace()
                     logger.error(f"API request failed: {response.status}")
+                    backend_errors.inc(
+                        endpoint=endpoint, reason=str(response.status)
+                    )
                     return None
 
+        except asyncio.TimeoutError:
+            logger.error(f"API request timeout: {endpoint}")
+            backend_errors.inc(endpoint=endpoint, reason="TimeoutError")
+            return None
         except Exception as e:
             logger.error(f"API request error: {e}")
+            backend_errors.inc(endpoint=endpoint, reason=type(e).__name__)
+            return None
+        finally:
+            backend_latency.observe(
+                time.perf_counter() - start, endpoint=endpoint
+            )
+
+    async def _refresh(self, key: str) -> Optional[Any]:
+        """Загрузка части снимка с backend и обновление кэша
+
+        Если ответ не изменился (304 или тот же хэш тела), кэш только
+        продлевается: значение, матрица и снимок на диске остаются
+        прежними.
+        """
+        # Загрузка общая для всех ожидающих ее команд и не должна
+        # прерываться по дедлайну той, что ее запустила
+        deadline_var.set(None)
+        generation = self.cache.generation(key)
+        validators = self._validators.get(key, Validators())
+
+        async def attempt():
+            # У каждой попытки (в том числе дублирующей) свое состояние
+            conditional = ConditionalRequest(validators)
+            stream = ResultsStreamParser() if key == "results" else None
+            result = await self._make_request(
+                f"/{key}", stream=stream, conditional=conditional
+            )
+            return None if result is None else (result, conditional)
+
+        outcome = await self.hedging.run(f"/{key}", attempt)
+        if outcome is None:
+            return None
+        result, conditional = outcome
+        if result is NOT_MODIFIED:
+            snapshot_refreshes.inc(key=key, result=conditional.result)
+            if self.cache.touch(key, generation):
+                self._validators[key] = conditional.current
+                return self.cache.get(key)[0]
+            # Кэш успел измениться - загружаем заново без условий
+            self._validators.pop(key, None)
+            return await self._refresh(key)
+        if isinstance(result, dict) and "error" in result:
             return None
+        snapshot_refreshes.inc(key=key, result="changed")
+        if key != "results":
+            result = decode_snapshot(key, result)
+        if self.cache.set(key, result, generation):
+            self._validators[key] = conditional.current
+            self._schedule_save()
+            self._reconcile(key, result)
+            if key == "results":
+                self._track_results(result)
+        return result
+
+    def _patch(self, key: str, update: Callable[[Any], Any]) -> bool:
+        """Локальная правка закэшированного значения после записи"""
+        value, _ = self.cache.get(key)
+        if value is None:
+            return False
+        self.cache.patch(key, update(value))
+        self._refreshing.pop(key, None)
+        # Правку нужно сверить с backend - следующая загрузка полная
+        self._validators.pop(key, None)
+        self._schedule_save()
+        return True
+
+    def _reconcile(self, key: str, value: Any):
+        """Сверка локальных правок кэша с загруженными данными"""
+        expected = self._expected[key]
+        if not expected:
+            return
+        self._expected[key] = {}
+
+        if key == "results":
+            mismatches = [
+                f"{cell}: ожидалось {expected_value}, "
+                f"на сервере {value.get(cell, 0)}"
+                for cell, expected_value in expected.items()
+                if value.get(cell, 0) != expected_value
+            ]
+        else:
+            ids = {item.id for item in value}
+            mismatches = [
+                f"id {item_id}: ожидалось "
+                f"{'наличие' if present else 'отсутствие'}"
+                for item_id, present in expected.items()
+                if (item_id in ids) != present
+            ]
+
+        if mismatches:
+            reconcile_mismatches.inc(len(mismatches), key=key)
+            logger.warning(
+                f"Кэш /{key} расходится с backend: " + "; ".join(mismatches)
+            )
+
+    def add_results_listener(
+        self, listener: Callable[[List[ResultChange]], Awaitable[None]]
+    ):
+        """Подписка на изменения результатов (из /results и записи бота)"""
+        self._results_listeners.append(listener)
+
+    def _track_results(self, results: Results):
+        """Поиск изменившихся ячеек по сравнению с прошлым снимком"""
+        if self._known_cells is not None:
+            teams, _ = self.cache.get("teams")
+            tasks, _ = self.cache.get("tasks")
+            changes = diff_cells(
+                self._known_cells,
+                results,
+                None if teams is None else {team.id for team in teams},
+                None if tasks is None else {task.id for task in tasks},
+            )
+            if changes:
+                self._notify_results_listeners(changes)
+        # Копия: _known_cells правится на месте, а кэш - нет
+        self._known_cells = dict(results)
+
+    def _notify_results_listeners(self, changes: List[ResultChange]):
+        for listener in self._results_listeners:
+            # Ссылка на задачу нужна, иначе ее может собрать сборщик
+            # мусора; запись истории и уведомления дожидаются при остановке
+            task = asyncio.create_task(self._call_listener(listener, changes))
+            self._listener_tasks.add(task)
+            task.add_done_callback(self._listener_tasks.discard)
+            name = getattr(listener, "__qualname__", repr(listener))
+            in_flight.track_task(task, f"{name} ({len(changes)} изменений)")
+
+    @staticmethod
+    async def _call_listener(listener, changes: List[ResultChange]):
+        try:
+            await listener(changes)
+        except Exception as e:
+            logger.error(f"Results listener error: {e}")
 
-    async def get_teams(self) -> List[Dict]:
+    def _discard(self, key: str):
+        """Сброс части снимка после изменения данных на backend"""
+        self.cache.discard(key)
+        self._refreshing.pop(key, None)
+        self._validators.pop(key, None)
+
+    async def _write(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Запрос на изменение данных; ответ backend или None при ошибке"""
+        details = ", ".join(
+            f"{name}={value}" for name, value in params.items()
+            if name != "token"
+        )
+        with in_flight.track(f"{endpoint} ({details})"):
+            result = await self._make_request(endpoint, params)
+        if result is None or result.get("error") == "invalid token":
+            return None
+        return result
+
+    def _start_refresh(self, key: str) -> asyncio.Task:
+        """Запуск обновления ключа (одно на ключ одновременно)"""
+        task = self._refreshing.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh(key))
+            self._refreshing[key] = task
+        return task
+
+    async def _get_cached(self, key: str) -> Optional[Any]:
+        """Получение части снимка из кэша или с backend
+
+        Свежие данные отдаются из кэша. Устаревшие тоже отдаются сразу,
+        а обновление запускается в фоне. Без данных в кэше запрос ждет
+        загрузки с backend.
+        """
+        value, fresh = self.cache.get(key)
+        record_cache_access(key, value is not None)
+        if value is not None:
+            if not fresh:
+                self._start_refresh(key)
+            return value
+        return await asyncio.shield(self._start_refresh(key))
+
+    def _schedule_save(self):
+        """Сохранение снимка на диск в фоне без блокировки event loop"""
+        if self._save_task is not None and not self._save_task.done():
+            self._save_again = True
+            return
+        self._save_task = asyncio.create_task(self._save_snapshot())
+
+    async def _save_snapshot(self):
+        self._save_again = True
+        while self._save_again:
+            self._save_again = False
+            await asyncio.to_thread(self.cache.save)
+
+    async def flush(self):
+        """Ожидание фонового сохранения снимка на диск"""
+        if self._save_task is not None:
+            await self._save_task
+
+    def load_snapshot(self) -> bool:
+        """Загрузка последнего сохраненного снимка с диска"""
+        loaded = self.cache.load()
+        results, _ = self.cache.get("results")
+        if results is not None and self._known_cells is None:
+            self._known_cells = dict(results)
+        return loaded
+
+    async def prefetch_snapshot(self):
+        """Загрузка свежего снимка teams/tasks/results с backend"""
+        await asyncio.gather(*(self._start_refresh(k) for k in SNAPSHOT_KEYS))
+
+    async def refresh_loop(self, interval: float):
+        """Периодическое обновление снимка (для поиска изменений)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.prefetch_snapshot()
+            except Exception as e:
+                logger.error(f"Snapshot refresh error: {e}")
+
+    async def get_teams(self) -> List[Team]:
         """Получение списка команд"""
-        result = await self._make_request("/teams")
-        return result if result else []
+        result = await self._get_cached("teams")
+        return list(result) if result else []
 
-    async def get_tasks(self) -> List[Dict]:
+    async def get_tasks(self) -> List[Task]:
         """Получение списка заданий"""
-        result = await self._make_request("/tasks")
-        return result if result else []
+        result = await self._get_cached("tasks")
+        return list(result) if result else []
 
-    async def get_results(self) -> Dict:
-        """Получение результатов команд"""
-        result = await self._make_request("/results")
+    async def get_results(self) -> Results:
+        """Получение результатов команд: {(team_id, task_id): баллы}"""
+        result = await self._get_cached("results")
         return result if result else {}
 
+    async def get_results_matrix(self) -> ResultsMatrix:
+        """Матрица результатов по текущему снимку
+
+        Матрица строится заново, только если изменился хотя бы один из
+        ответов /teams, /tasks, /results (закэшированные значения не
+        изменяются на месте, а заменяются).
+        """
+        source = tuple(
+            await asyncio.gather(*(self._get_cached(k) for k in SNAPSHOT_KEYS))
+        )
+        if self._matrix is None or any(
+            new is not old for new, old in zip(source, self._matrix_source)
+        ):
+            teams, tasks, results = source
+            self._matrix = ResultsMatrix.from_snapshot(
+                teams or [], tasks or [], results or {}
+            )
+            self._matrix_source = source
+        return self._matrix
+
+    async def get_task_index(self) -> TaskIndex:
+        """Задания текущего снимка по предметам
+
+        Индекс строится заново, только если изменился ответ /tasks.
+        """
+        tasks = await self._get_cached("tasks")
+        if self._task_index is None or tasks is not self._task_index_source:
+            self._task_index = TaskIndex(tasks or [])
+            self._task_index_source = tasks
+        return self._task_index
+
     async def add_team(self, token: str, building: int, name: str) -> bool:
         """Добавление новой команды"""
         params = {"token": token, "building": building, "name": name}
-        result = await self._make_request("/teams/add", params)
-        return result is not None and result.get("error") != "invalid token"
+        result = await self._write("/teams/add", params)
+        if result is None:
+            return False
+        team = Team(result.get("id"), name, building)
+        self._patch_added("teams", team)
+        return True
 
     async def remove_team(self, token: str, team_id: int) -> bool:
         """Удаление команды"""
         params = {"token": token, "id": team_id}
-        result = await self._make_request("/teams/del", params)
-        return result is not None and result.get("error") != "invalid token"
+        if await self._write("/teams/del", params) is None:
+            return False
+        self._patch_removed("teams", team_id)
+        return True
 
     async def add_task(self, token: str, subject: str, name: str) -> bool:
         """Добавление нового задания"""
         params = {"token": token, "subject": subject, "name": name}
-        result = await self._make_request("/tasks/add", params)
-        return result is not None and result.get("error") != "invalid token"
+        result = await self._write("/tasks/add", params)
+        if result is None:
+            return False
+        task = Task(result.get("id"), name, subject)
+        self._patch_added("tasks", task)
+        return True
 
     async def remove_task(self, token: str, task_id: int) -> bool:
         """Удаление задания"""
         params = {"token": token, "id": task_id}
-        result = await self._make_request("/tasks/del", params)
-        return result is not None and result.get("error") != "invalid token"
+        if await self._write("/tasks/del", params) is None:
+            return False
+        self._patch_removed("tasks", task_id)
+        return True
+
+    def _patch_added(self, key: str, item):
+        """Добавление сущности в закэшированный список"""
+        if item.id is None:
+            # backend не вернул ID - список перечитаем при следующем запросе
+            self._discard(key)
+        elif self._patch(key, lambda items: items + [item]):
+            self._expected[key][item.id] = True
+
+    def _patch_removed(self, key: str, item_id: int):
+        """Удаление сущности из закэшированного списка"""
+        if self._patch(
+            key, lambda items: [i for i in items if i.id != item_id]
+        ):
+            self._expected[key][item_id] = False
+
+    def _current_result(self, team_id: int, task_id: int) -> Optional[int]:
+        """Значение ячейки по свежему снимку (None - неизвестно)"""
+        results, fresh = self.cache.get("results")
+        if results is None or not fresh:
+            return None
+        return results.get((team_id, task_id))
 
     async def set_result(
         self, token: str, team_id: int, task_id: int, value: int
-    ) -> bool:
-        """Установка результата команды для задания"""
+    ) -> SetResultStatus:
+        """Установка результата команды для задания
+
+        Записи одной ячейки отправляются в backend по одной в порядке
+        поступления, из ожидающих отправляется только последняя; записи
+        разных ячеек идут параллельно. Если записей ячейки нет и по
+        свежему снимку значение уже установлено, запрос в backend
+        не отправляется.
+        """
+        cell = (team_id, task_id)
+        if (
+            not self._cell_writes.pending(cell)
+            and self._current_result(team_id, task_id) == value
+        ):
+            suppressed_writes.inc(reason="unchanged")
+            return SetResultStatus.UNCHANGED
+
+        return await asyncio.shield(
+            self._cell_writes.submit(
+                cell,
+                value,
+                lambda: self._set_result(token, team_id, task_id, value),
+            )
+        )
+
+    async def _set_result(
+        self, token: str, team_id: int, task_id: int, value: int
+    ) -> SetResultStatus:
         params = {
             "token": token,
             "team_id": team_id,
             "task_id": task_id,
             "value": value,
         }
-        result = await self._make_request("/results/set", params)
-        return result is not None and result.get("error") != "invalid token"
+        if await self._write("/results/set", params) is None:
+            return SetResultStatus.FAILED
+
+        if self._patch(
+            "results",
+            lambda results: {**results, (team_id, task_id): value},
+        ):
+            self._expected["results"][(team_id, task_id)] = value
+
+        old_value = None
+        if self._known_cells is not None:
+            old_value = self._known_cells.get((team_id, task_id), 0)
+            self._known_cells[(team_id, task_id)] = value
+        self._notify_results_listeners(
+            [
+                ResultChange(
+                    team_id,
+                    task_id,
+                    old_value,
+                    value,
+                    user_id=user_id_var.get(),
+                    source="bot",
+                    timestamp=time.time(),
+                )
+            ]
+        )
+        return SetResultStatus.SET
 
     async def set_date(self, token: str, value: str) -> bool:
         """Установка даты"""
         params = {"token": token, "value": value}
-        result = await self._make_request("/date/set", params)
-        return result is not None and result.get("error") != "invalid token"
+        return await self._write("/date/set", params) is not None
 
     def find_team_by_name(
-        self, teams: List[Dict], name: str
-    ) -> Optional[Dict]:
+        self, teams: List[Team], name: str
+    ) -> Optional[Team]:
         """Поиск команды по имени и зданию"""
         for team in teams:
-            if team.get("name") == name:
+            if team.name == name:
                 return team
         return None
 
+    def find_teams_by_prefix(
+        self, teams: List[Team], name: str
+    ) -> List[Team]:
+        """Поиск команд по точному имени или началу имени без учета
+        регистра (точное совпадение имеет приоритет)"""
+        team = self.find_team_by_name(teams, name)
+        if team:
+            return [team]
+        lc = name.lower()
+        return [t for t in teams if t.name_key.startswith(lc)]
+
     def find_task_by_name_and_subject(
-        self, tasks: List[Dict], name: str, subject: str
-    ) -> Optional[Dict]:
+        self, tasks: List[Task], name: str, subject: str
+    ) -> Optional[Task]:
         """Поиск задания по имени и предмету"""
         for task in tasks:
-            if task.get("name") == name and task.get("subject") == subject:
+            if task.name == name and task.subject == subject:
                 return task
         return None
 
     def get_team_result(
-        self, results: Dict, team_id: int, task_id: int
+        self, results: Results, team_id: int, task_id: int
     ) -> int:
         """Получение результата команды для конкретного задания"""
-        if str(team_id) in results:
-            team_results = results[str(team_id)].get("results", [])
-            for result in team_results:
-                if result.get("taskInfo", {}).get("id") == task_id:
-                    return result.get("result", 0)
-        return 0
+        return results.get((team_id, task_id), 0)
 
 
 # Глобальный экземпляр API клиента
@@ -0,0 +1,85 @@
+import json
+import re
+from typing import Any, Optional
+from api.models import Results, parse_results
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен - без него работает json
+    orjson = None
+
+# Возможная граница элементов верхнего уровня: конец объекта и ключ
+# следующей команды. Внутри строк и вложенных объектов такое тоже может
+# встретиться - это проверяется разбором найденного фрагмента.
+_BOUNDARY = re.compile(rb'\}\s*,\s*(?="\d+"\s*:)')
+# Граница может прийти разрезанной между частями тела
+_BOUNDARY_OVERLAP = 64
+
+
+def loads(data: bytes) -> Any:
+    """Разбор JSON прямо из байтов (orjson, если установлен)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class ResultsStreamParser:
+    """Потоковый разбор ответа /results по мере получения тела
+
+    Ответ - объект {team_id: {"results": [...]}}. Как только элемент
+    верхнего уровня получен целиком, он разбирается и добавляется в
+    результаты, а его байты выбрасываются, поэтому ни полное тело, ни
+    полное дерево JSON в памяти не хранятся. Если тело не объект, оно
+    разбирается целиком в close().
+    """
+
+    def __init__(self):
+        self.results: Results = {}
+        self._buffer = bytearray()
+        # Начало еще не разобранных элементов и позиция поиска границы
+        self._start: Optional[int] = None
+        self._pos = 0
+        self._whole = False
+
+    def feed(self, chunk: bytes):
+        """Обработка очередной части тела ответа"""
+        self._buffer += chunk
+        if self._whole:
+            return
+        if self._start is None:
+            body = self._buffer.lstrip()
+            if not body:
+                return
+            if body[:1] != b"{":
+                # Тело не объект - разбираем целиком в close()
+                self._whole = True
+                return
+            self._start = self._pos = len(self._buffer) - len(body) + 1
+
+        for match in _BOUNDARY.finditer(self._buffer, self._pos):
+            end = match.start() + 1
+            try:
+                self._add(self._buffer[self._start:end])
+            except ValueError:
+                # Граница внутри строки или вложенного объекта
+                continue
+            self._start = match.end()
+        self._pos = max(self._start, len(self._buffer) - _BOUNDARY_OVERLAP)
+
+        if self._start:
+            del self._buffer[:self._start]
+            self._pos -= self._start
+            self._start = 0
+
+    def _add(self, entries: bytes):
+        self.results.update(parse_results(loads(b"{" + entries + b"}")))
+
+    def close(self) -> Results:
+        """Завершение разбора и получение результатов"""
+        if self._whole or self._start is None:
+            return parse_results(loads(bytes(self._buffer)))
+        # Остаток уже содержит закрывающую скобку объекта
+        self.results.update(
+            parse_results(loads(b"{" + self._buffer[self._start:]))
+        )
+        return self.results
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+hedged_requests = metrics.counter(
+    "is57bot_backend_hedged_requests_total",
+    "Дублированные запросы к API: started, won, lost, no_budget",
+    ["endpoint", "result"],
+)
+
+
+class HedgePolicy:
+    """Дублирование медленных идемпотентных запросов
+
+    Если первая попытка не ответила за percentile недавних задержек
+    эндпоинта, запускается вторая; берется ответ той, что закончилась
+    первой, другая отменяется. Каждый запрос добавляет budget токенов
+    (не больше burst), дублирование тратит один токен, поэтому доля
+    дублированных запросов не превышает budget.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        budget: float,
+        window: int,
+        min_samples: int,
+        burst: float = 10.0,
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.window = window
+        self.min_samples = min_samples
+        self.burst = burst
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._tokens = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0 and 0 < self.percentile < 1
+
+    def record(self, endpoint: str, latency: float):
+        """Учет задержки завершившейся попытки"""
+        samples = self._latencies.get(endpoint)
+        if samples is None:
+            samples = self._latencies[endpoint] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Через сколько секунд дублировать запрос (None - не дублировать)"""
+        samples = self._latencies.get(endpoint)
+        if not self.enabled or len(samples or ()) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile))
+        return ordered[index]
+
+    def _acquire(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def run(
+        self,
+        endpoint: str,
+        attempt: Callable[[], Awaitable[Optional[T]]],
+    ) -> Optional[T]:
+        """Выполнение запроса с возможным дублированием
+
+        attempt запускает одну попытку и возвращает None при ошибке:
+        неудачный ответ одной попытки не отменяет другую.
+        """
+        self._tokens = min(self.burst, self._tokens + self.budget)
+        delay = self.delay(endpoint)
+        if delay is None:
+            return await self._timed(endpoint, attempt)
+
+        tasks = [asyncio.create_task(self._timed(endpoint, attempt))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._acquire():
+                hedged_requests.inc(endpoint=endpoint, result="started")
+                tasks.append(
+                    asyncio.create_task(self._timed(endpoint, attempt))
+                )
+            elif not done:
+                hedged_requests.inc(endpoint=endpoint, result="no_budget")
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in (t for t in tasks if t in done):
+                    result = task.result()
+                    if result is None:
+                        continue
+                    if len(tasks) > 1:
+                        # won - быстрее оказался дублирующий запрос
+                        hedged = "won" if task is tasks[1] else "lost"
+                        hedged_requests.inc(endpoint=endpoint, result=hedged)
+                    return result
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _timed(
+        self, endpoint: str, attempt: Callable[[], Awaitable[Optional[T]]]
+    ) -> Optional[T]:
+        start = time.perf_counter()
+        result = await attempt()
+        if result is not None:
+            # Быстрые ошибки не должны занижать порог дублирования
+            self.record(endpoint, time.perf_counter() - start)
+        return result
@@ -0,0 +1,278 @@
+from array import array
+from itertools import groupby
+from statistics import median
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from api.models import Results, Task, Team
+
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен - без него работает array
+    np = None
+
+
+class TaskStats(NamedTuple):
+    """Распределение баллов по заданию среди команд с результатом"""
+
+    filled: int
+    mean: float
+    median: float
+    max: int
+    # Здание -> (число команд с результатом, средний балл)
+    buildings: Dict[int, Tuple[int, float]]
+
+
+class SubjectStats(NamedTuple):
+    """Сводка по предмету: заполненность и средняя сумма баллов команды"""
+
+    tasks: int
+    filled: int
+    mean_total: float
+    # Здание -> средняя сумма баллов команды здания по предмету
+    buildings: Dict[int, float]
+
+
+class ResultsMatrix:
+    """Плотная матрица результатов: строки - команды, столбцы - задания
+
+    Строится один раз на снимок /teams, /tasks и /results. Команды
+    упорядочены как в админке (по зданию по убыванию), задания - по
+    предмету, поэтому задания одного предмета идут подряд. Значения
+    хранятся в numpy массиве, если numpy установлен, иначе в array('q');
+    отдельная маска отмечает ячейки, для которых есть результат.
+    """
+
+    def __init__(self, teams: List[Team], tasks: List[Task]):
+        self.teams = sorted(teams, key=lambda x: x.building, reverse=True)
+        self.tasks = sorted(tasks, key=lambda x: x.subject)
+        self.team_index = {t.id: i for i, t in enumerate(self.teams)}
+        self.task_index = {t.id: j for j, t in enumerate(self.tasks)}
+        self.n_teams = len(self.teams)
+        self.n_tasks = len(self.tasks)
+
+        # Предмет -> (первый столбец, столбец после последнего)
+        self.subject_slices: Dict[str, Tuple[int, int]] = {}
+        start = 0
+        for subject, group in groupby(self.tasks, key=lambda x: x.subject):
+            end = start + len(list(group))
+            self.subject_slices[subject] = (start, end)
+            start = end
+
+        self.buildings = sorted(
+            {t.building for t in self.teams}, reverse=True
+        )
+        self._task_stats: Optional[List[TaskStats]] = None
+        self._subject_stats: Optional[Dict[str, SubjectStats]] = None
+
+        size = self.n_teams * self.n_tasks
+        if np is not None:
+            self.values = np.zeros((self.n_teams, self.n_tasks), np.int64)
+            self.filled = np.zeros((self.n_teams, self.n_tasks), np.bool_)
+        else:
+            self.values = array("q", bytes(8 * size))
+            self.filled = bytearray(size)
+
+    @classmethod
+    def from_snapshot(
+        cls, teams: List[Team], tasks: List[Task], results: Results
+    ) -> "ResultsMatrix":
+        """Построение матрицы по снимку команд, заданий и результатов"""
+        matrix = cls(teams, tasks)
+        for (team_id, task_id), value in results.items():
+            matrix.set(team_id, task_id, value)
+        return matrix
+
+    def set(self, team_id: int, task_id: int, value: int):
+        """Запись результата (неизвестные команды и задания пропускаются)"""
+        i = self.team_index.get(team_id)
+        j = self.task_index.get(task_id)
+        if i is not None and j is not None:
+            self._set(i, j, value)
+
+    def _set(self, i: int, j: int, value: int):
+        self._task_stats = self._subject_stats = None
+        if np is not None:
+            self.values[i, j] = value
+            self.filled[i, j] = True
+        else:
+            self.values[i * self.n_tasks + j] = value
+            self.filled[i * self.n_tasks + j] = 1
+
+    def get(self, team_id: int, task_id: int) -> int:
+        """Результат команды по заданию (0 - нет результата)"""
+        i = self.team_index.get(team_id)
+        j = self.task_index.get(task_id)
+        if i is None or j is None:
+            return 0
+        if np is not None:
+            return int(self.values[i, j])
+        return self.values[i * self.n_tasks + j]
+
+    def row(self, i: int) -> List[int]:
+        """Результаты команды с индексом i по всем заданиям"""
+        if np is not None:
+            return self.values[i].tolist()
+        return self.values[i * self.n_tasks:(i + 1) * self.n_tasks].tolist()
+
+    def filled_row(self, i: int) -> List[bool]:
+        """Есть ли у команды с индексом i результат по каждому заданию"""
+        if np is not None:
+            return self.filled[i].tolist()
+        start = i * self.n_tasks
+        return [bool(x) for x in self.filled[start:start + self.n_tasks]]
+
+    def column(self, j: int) -> List[int]:
+        """Результаты всех команд по заданию с индексом j"""
+        if np is not None:
+            return self.values[:, j].tolist()
+        return self.values[j::self.n_tasks].tolist() if self.n_tasks else []
+
+    def team_totals(self, columns: Optional[Tuple[int, int]] = None):
+        """Сумма баллов каждой команды (по всем или по диапазону столбцов)"""
+        start, end = columns or (0, self.n_tasks)
+        if np is not None:
+            return self.values[:, start:end].sum(axis=1).tolist()
+        n = self.n_tasks
+        return [
+            sum(self.values[i * n + start:i * n + end])
+            for i in range(self.n_teams)
+        ]
+
+    def subject_totals(self) -> Dict[str, List[int]]:
+        """Суммы баллов команд по каждому предмету"""
+        if np is not None and self.n_tasks and self.n_teams:
+            starts = [start for start, _ in self.subject_slices.values()]
+            sums = np.add.reduceat(self.values, starts, axis=1)
+            return {
+                subject: sums[:, k].tolist()
+                for k, subject in enumerate(self.subject_slices)
+            }
+        return {
+            subject: self.team_totals(columns)
+            for subject, columns in self.subject_slices.items()
+        }
+
+    def ranks(self) -> List[int]:
+        """Место каждой команды по сумме баллов (равные суммы - одно место)"""
+        totals = self.team_totals()
+        if np is not None:
+            values = np.asarray(totals)
+            # место = 1 + число команд с большей суммой
+            ordered = np.sort(values)[::-1]
+            return (
+                np.searchsorted(-ordered, -values, side="left") + 1
+            ).tolist()
+        ordered = sorted(totals, reverse=True)
+        first_place = {}
+        for place, total in enumerate(ordered, 1):
+            first_place.setdefault(total, place)
+        return [first_place[total] for total in totals]
+
+    def _filled_column(self, j: int) -> List[int]:
+        """Баллы по заданию j только у команд, у которых есть результат"""
+        if np is not None:
+            return self.values[self.filled[:, j], j].tolist()
+        n = self.n_tasks
+        return [
+            self.values[i * n + j]
+            for i in range(self.n_teams)
+            if self.filled[i * n + j]
+        ]
+
+    def _building_rows(self) -> Dict[int, List[int]]:
+        rows: Dict[int, List[int]] = {b: [] for b in self.buildings}
+        for i, team in enumerate(self.teams):
+            rows[team.building].append(i)
+        return rows
+
+    def task_stats(self) -> List[TaskStats]:
+        """Статистика по каждому заданию (считается один раз на матрицу)"""
+        if self._task_stats is not None:
+            return self._task_stats
+
+        building_rows = self._building_rows()
+        if np is not None:
+            filled_counts = self.filled.sum(axis=0)
+            counts = filled_counts.tolist()
+            sums = self.values.sum(axis=0, where=self.filled).tolist()
+            # Баллы бывают отрицательными: initial - наименьшее значение,
+            # 0 - только для заданий без результатов
+            maxes = np.where(
+                filled_counts > 0,
+                self.values.max(
+                    axis=0,
+                    where=self.filled,
+                    initial=np.iinfo(self.values.dtype).min,
+                ),
+                0,
+            ).tolist()
+            per_building = {
+                b: (
+                    self.filled[rows].sum(axis=0).tolist(),
+                    self.values[rows].sum(
+                        axis=0, where=self.filled[rows]
+                    ).tolist(),
+                )
+                for b, rows in building_rows.items()
+            }
+        else:
+            columns = [self._filled_column(j) for j in range(self.n_tasks)]
+            counts = [len(column) for column in columns]
+            sums = [sum(column) for column in columns]
+            maxes = [max(column, default=0) for column in columns]
+            n = self.n_tasks
+            per_building = {}
+            for b, rows in building_rows.items():
+                b_counts = [0] * n
+                b_sums = [0] * n
+                for i in rows:
+                    for j in range(n):
+                        if self.filled[i * n + j]:
+                            b_counts[j] += 1
+                            b_sums[j] += self.values[i * n + j]
+                per_building[b] = (b_counts, b_sums)
+
+        stats = []
+        for j in range(self.n_tasks):
+            count = counts[j]
+            column = self._filled_column(j)
+            stats.append(
+                TaskStats(
+                    filled=count,
+                    mean=sums[j] / count if count else 0.0,
+                    median=float(median(column)) if column else 0.0,
+                    max=maxes[j],
+                    buildings={
+                        b: (
+                            b_counts[j],
+                            b_sums[j] / b_counts[j] if b_counts[j] else 0.0,
+                        )
+                        for b, (b_counts, b_sums) in per_building.items()
+                    },
+                )
+            )
+        self._task_stats = stats
+        return stats
+
+    def subject_stats(self) -> Dict[str, SubjectStats]:
+        """Сводка по каждому предмету (считается один раз на матрицу)"""
+        if self._subject_stats is not None:
+            return self._subject_stats
+
+        task_stats = self.task_stats()
+        building_rows = self._building_rows()
+        stats = {}
+        for subject, totals in self.subject_totals().items():
+            start, end = self.subject_slices[subject]
+            stats[subject] = SubjectStats(
+                tasks=end - start,
+                filled=sum(s.filled for s in task_stats[start:end]),
+                mean_total=(
+                    sum(totals) / self.n_teams if self.n_teams else 0.0
+                ),
+                buildings={
+                    b: sum(totals[i] for i in rows) / len(rows)
+                    for b, rows in building_rows.items()
+                },
+            )
+        self._subject_stats = stats
+        return stats
@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Tuple
+
+# Результаты снимка: {(team_id, task_id): баллы}
+Results = Dict[Tuple[int, int], int]
+
+
+class Team:
+    """Команда из ответа /teams"""
+
+    __slots__ = ("id", "name", "building", "name_key")
+
+    def __init__(self, id: int, name: str, building: int):
+        self.id = id
+        self.name = name
+        self.building = building
+        # Имя в нижнем регистре для поиска без учета регистра
+        self.name_key = name.lower()
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "Team":
+        return cls(data.get("id"), data.get("name", ""), data.get("building"))
+
+    def to_json(self) -> Dict:
+        return {"id": self.id, "name": self.name, "building": self.building}
+
+    def __repr__(self) -> str:
+        return f"Team({self.id!r}, {self.name!r}, {self.building!r})"
+
+
+class Task:
+    """Задание из ответа /tasks (предмет приводится к нижнему регистру)"""
+
+    __slots__ = ("id", "name", "subject", "name_key")
+
+    def __init__(self, id: int, name: str, subject: str):
+        self.id = id
+        self.name = name
+        self.subject = subject.lower()
+        self.name_key = name.lower()
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "Task":
+        return cls(
+            data.get("id"), data.get("name", ""), data.get("subject", "")
+        )
+
+    def to_json(self) -> Dict:
+        return {"id": self.id, "name": self.name, "subject": self.subject}
+
+    def __repr__(self) -> str:
+        return f"Task({self.id!r}, {self.name!r}, {self.subject!r})"
+
+
+class TaskIndex:
+    """Задания снимка, сгруппированные по предметам
+
+    Предметы отсортированы по названию, задания внутри предмета идут в
+    порядке снимка.
+    """
+
+    def __init__(self, tasks: List[Task]):
+        self.by_id: Dict[int, Task] = {task.id: task for task in tasks}
+        by_subject: Dict[str, List[Task]] = {}
+        for task in tasks:
+            by_subject.setdefault(task.subject, []).append(task)
+        self.subjects: List[str] = sorted(by_subject)
+        self.by_subject = {s: by_subject[s] for s in self.subjects}
+
+
+def parse_results(data: Dict) -> Results:
+    """Разбор ответа /results в {(team_id, task_id): баллы}"""
+    results = {}
+    for team_id, team_results in data.items():
+        team_id = int(team_id)
+        for result in team_results.get("results", []):
+            task_id = result.get("taskInfo", {}).get("id")
+            if task_id is not None:
+                results[(team_id, task_id)] = result.get("result", 0)
+    return results
+
+
+def results_to_json(results: Results) -> Dict:
+    """Обратное преобразование результатов в формат ответа /results"""
+    data: Dict[str, Dict] = {}
+    for (team_id, task_id), value in results.items():
+        data.setdefault(str(team_id), {"results": []})["results"].append(
+            {"taskInfo": {"id": task_id}, "result": value}
+        )
+    return data
+
+
+def decode_snapshot(key: str, data: Any) -> Any:
+    """Разбор части снимка (ответа backend) в модели"""
+    if key == "teams":
+        return [Team.from_json(item) for item in data]
+    if key == "tasks":
+        return [Task.from_json(item) for item in data]
+    return parse_results(data)
+
+
+def encode_snapshot(key: str, value: Any) -> Any:
+    """Преобразование части снимка обратно в формат backend"""
+    if key == "results":
+        return results_to_json(value)
+    return [item.to_json() for item in value]
@@ -0,0 +1,112 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from utils.metrics import metrics
+
+suppressed_writes = metrics.counter(
+    "is57bot_set_result_suppressed_total",
+    "Запросы установки результата, не отправленные в backend",
+    ["reason"],
+)
+
+
+class _PendingWrite:
+    __slots__ = ("value", "run", "context", "future", "replaced")
+
+    def __init__(self, value: Any, run: Callable[[], Awaitable[Any]]):
+        self.value = value
+        self.run = run
+        # Вытесненные этой записью более ранние (ждут ее итога)
+        self.replaced: List["_PendingWrite"] = []
+        # Запись выполняется в контексте того, кто ее поставил
+        # (автор изменения, дедлайн команды)
+        self.context = contextvars.copy_context()
+        self.future: asyncio.Future = (
+            asyncio.get_running_loop().create_future()
+        )
+
+
+class _KeyState:
+    __slots__ = ("running", "queued")
+
+    def __init__(self):
+        self.running: Optional[_PendingWrite] = None
+        self.queued: Optional[_PendingWrite] = None
+
+
+class KeyedWriteQueue:
+    """Последовательные записи по ключу с объединением ожидающих
+
+    Записи с одним ключом выполняются по одной в порядке поступления.
+    Из ожидающих записей остается только последняя (last writer wins).
+    Вытесненные получают итог, когда она выполнится: ее результат, если
+    значение совпало с записанным, иначе superseded. Запись того же
+    значения, что уже выполняется или ждет, присоединяется к ней. Записи
+    с разными ключами выполняются параллельно.
+    """
+
+    def __init__(self, superseded: Any):
+        self.superseded = superseded
+        self._keys: Dict[Hashable, _KeyState] = {}
+
+    def pending(self, key: Hashable) -> bool:
+        """Есть ли выполняющиеся или ожидающие записи ключа"""
+        return key in self._keys
+
+    def submit(
+        self, key: Hashable, value: Any, run: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        """Постановка записи value в очередь; future - ее итог"""
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState()
+            state.queued = _PendingWrite(value, run)
+            asyncio.create_task(self._drain(key, state))
+            return state.queued.future
+
+        last = state.queued or state.running
+        if last is not None and last.value == value:
+            suppressed_writes.inc(reason="duplicate")
+            return last.future
+
+        write = _PendingWrite(value, run)
+        if state.queued is not None:
+            suppressed_writes.inc(reason="superseded")
+            write.replaced = [state.queued, *state.queued.replaced]
+            state.queued.replaced = []
+        state.queued = write
+        return write.future
+
+    def _settle(self, write: _PendingWrite, result=None, error=None):
+        """Итог записи и вытесненных ею записей"""
+        for other in (write, *write.replaced):
+            if other.future.done():
+                continue
+            if other is not write and other.value != write.value:
+                other.future.set_result(self.superseded)
+            elif error is not None:
+                other.future.set_exception(error)
+            else:
+                other.future.set_result(result)
+
+    async def _drain(self, key: Hashable, state: _KeyState):
+        try:
+            while state.queued is not None:
+                write = state.running = state.queued
+                state.queued = None
+                try:
+                    result = await write.context.run(
+                        asyncio.create_task, write.run()
+                    )
+                except Exception as e:
+                    self._settle(write, error=e)
+                else:
+                    self._settle(write, result)
+        finally:
+            self._keys.pop(key, None)
+            for write in (state.running, state.queued):
+                if write is None:
+                    continue
+                for other in (write, *write.replaced):
+                    if not other.future.done():
+                        other.future.cancel()
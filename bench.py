@@ -0,0 +1,225 @@
+"""Микробенчмарки горячих путей форматирования, поиска и разбиения
+
+Бенчмарки выполняются на синтетических данных нескольких размеров
+(команды x задания). Результаты прогона можно сохранить как базовые и
+сравнить с ними следующий прогон, например после изменения кода:
+
+    python bench.py run --save
+    python bench.py compare
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from api import api_client
+from api.matrix import ResultsMatrix, np
+from api.models import Task, Team
+from config.settings import BUILDINGS, LEGAL_SYMBOLS, SUBJECTS
+from utils.helpers import (
+    format_results_table,
+    format_team_results,
+    get_team_task_result,
+    split_long_message,
+    validate_name,
+)
+
+BASELINE_FILE = "bench_baseline.json"
+# Размеры данных: (команд, заданий)
+SCALES = [(10, 50), (10, 500), (100, 50), (100, 500), (1000, 50), (1000, 500)]
+# Сколько поисков выполняет один вызов бенчмарков поиска
+LOOKUPS = 1000
+# Доля заполненных ячеек результатов
+FILL_RATE = 0.7
+
+
+class Dataset:
+    """Синтетический снимок и входные данные бенчмарков"""
+
+    def __init__(self, n_teams: int, n_tasks: int, seed: int = 57):
+        rng = random.Random(seed)
+        self.teams = [
+            Team(i, f"{i % 11}{'АБВГД'[i % 5]} Команда {i}", BUILDINGS[i % 2])
+            for i in range(1, n_teams + 1)
+        ]
+        self.tasks = [
+            Task(j, f"Задание {j}", SUBJECTS[j % len(SUBJECTS)])
+            for j in range(1, n_tasks + 1)
+        ]
+        self.results = {
+            (team.id, task.id): rng.randint(1, 10)
+            for team in self.teams
+            for task in self.tasks
+            if rng.random() < FILL_RATE
+        }
+        self.matrix = ResultsMatrix.from_snapshot(
+            self.teams, self.tasks, self.results
+        )
+        self.lookups = [
+            (rng.choice(self.teams).id, rng.choice(self.tasks).id)
+            for _ in range(LOOKUPS)
+        ]
+        # Префиксы, как их вводят в /s: начало имени в другом регистре
+        self.prefixes = [
+            rng.choice(self.teams).name[: rng.randint(2, 8)].lower()
+            for _ in range(LOOKUPS)
+        ]
+        self.results_text = format_team_results(self.matrix)
+
+
+def bench_format_results_table(data: Dataset):
+    format_results_table(data.matrix)
+
+
+def bench_results_render(data: Dataset):
+    format_team_results(data.matrix)
+
+
+def bench_get_team_task_result(data: Dataset):
+    for team_id, task_id in data.lookups:
+        get_team_task_result(data.results, team_id, task_id)
+
+
+def bench_split_long_message(data: Dataset):
+    split_long_message(data.results_text)
+
+
+def bench_validate_name(data: Dataset):
+    for team in data.teams:
+        validate_name(team.name, LEGAL_SYMBOLS)
+
+
+def bench_find_teams_by_prefix(data: Dataset):
+    for prefix in data.prefixes:
+        api_client.find_teams_by_prefix(data.teams, prefix)
+
+
+# Имя -> функция одного вызова бенчмарка
+BENCHMARKS: Dict[str, Callable[[Dataset], None]] = {
+    "format_results_table": bench_format_results_table,
+    "results_render": bench_results_render,
+    f"get_team_task_result x{LOOKUPS}": bench_get_team_task_result,
+    "split_long_message": bench_split_long_message,
+    "validate_name (все команды)": bench_validate_name,
+    f"find_teams_by_prefix x{LOOKUPS}": bench_find_teams_by_prefix,
+}
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее время одного вызова func в секундах"""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    return min(timer.repeat(repeat, loops)) / loops
+
+
+def run(repeat: int, only: Optional[str] = None) -> Dict[str, Any]:
+    """Прогон бенчмарков на всех размерах данных"""
+    results: Dict[str, Dict[str, float]] = {}
+    for n_teams, n_tasks in SCALES:
+        scale = f"{n_teams}x{n_tasks}"
+        data = Dataset(n_teams, n_tasks)
+        for name, bench in BENCHMARKS.items():
+            if only and only not in name:
+                continue
+            seconds = measure(lambda: bench(data), repeat)
+            results.setdefault(name, {})[scale] = seconds
+            print(f"{name:<36} {scale:>9} {seconds * 1000:>12.3f} ms")
+    return {
+        "python": platform.python_version(),
+        "numpy": np is not None,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> bool:
+    """Таблица различий с базовыми результатами; True при регрессиях"""
+    if (baseline["python"], baseline["numpy"]) != (
+        current["python"],
+        current["numpy"],
+    ):
+        print(
+            "⚠️ Окружение отличается от базового: "
+            f"python {baseline['python']} -> {current['python']}, "
+            f"numpy {baseline['numpy']} -> {current['numpy']}"
+        )
+
+    rows: List[Tuple[str, str, float, float]] = [
+        (name, scale, baseline["results"][name][scale], seconds)
+        for name, scales in current["results"].items()
+        for scale, seconds in scales.items()
+        if scale in baseline["results"].get(name, {})
+    ]
+    regressed = False
+    print(
+        f"{'':<36} {'':>9} {'base, ms':>12} {'new, ms':>12} {'change':>8}"
+    )
+    for name, scale, old, new in rows:
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change > threshold
+        regressed = regressed or worse
+        print(
+            f"{name:<36} {scale:>9} {old * 1000:>12.3f} {new * 1000:>12.3f} "
+            f"{change:>+7.1f}%" + (" !" if worse else "")
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="выполнить бенчмарки")
+    run_parser.add_argument(
+        "--save",
+        nargs="?",
+        const=BASELINE_FILE,
+        help=f"сохранить как базовые (по умолчанию {BASELINE_FILE})",
+    )
+    run_parser.add_argument("-o", "--output", help="сохранить результаты")
+
+    diff = commands.add_parser(
+        "compare", help="выполнить бенчмарки и сравнить с базовыми"
+    )
+    diff.add_argument("--baseline", default=BASELINE_FILE)
+    diff.add_argument(
+        "--current", help="сравнить сохраненные результаты без прогона"
+    )
+    diff.add_argument(
+        "--threshold",
+        type=float,
+        default=15.0,
+        help="допустимое замедление, %% (иначе код возврата 1)",
+    )
+
+    for sub in (run_parser, diff):
+        sub.add_argument("--filter", help="только бенчмарки с подстрокой")
+        sub.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "compare" and args.current:
+        with open(args.current) as f:
+            report = json.load(f)
+    else:
+        report = run(args.repeat, args.filter)
+
+    if args.command == "run":
+        for path in filter(None, (args.save, args.output)):
+            with open(path, "w") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+                f.write("\n")
+            print(f"Результаты сохранены в {path}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print()
+    sys.exit(1 if compare(baseline, report, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
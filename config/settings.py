@@ -15,12 +15,103 @@ ADMIN_USER_ID = int(os.getenv("ADMIN_USER_ID", "0"))
 ALLOWED_USERS = []  # Список разрешенных пользователей (заполняется из файла)
 ALLOWED_GROUPS = []  # Список разрешенных групп (заполняется из файла)
 
+# Локальный HTTP сервер метрик и проверок состояния (0 - отключен)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9157"))
+# /healthz: наибольшее опоздание event loop (сек) и сколько секунд может
+# пройти с последнего успешного запроса getUpdates
+HEALTH_MAX_LOOP_LAG = float(os.getenv("HEALTH_MAX_LOOP_LAG", "1"))
+HEALTH_MAX_POLLING_AGE = float(os.getenv("HEALTH_MAX_POLLING_AGE", "60"))
+# /readyz: сколько секунд может пройти с последнего успешного ответа backend
+READY_MAX_BACKEND_AGE = float(os.getenv("READY_MAX_BACKEND_AGE", "60"))
+
+# Сколько секунд может выполняться команда; запросы к API получают
+# оставшееся время как таймаут (0 - без ограничения)
+HANDLER_DEADLINE = float(os.getenv("HANDLER_DEADLINE", "20"))
+
+# Допуск команд к обработке: сколько дешевых (без запросов к backend) и
+# дорогих команд выполняется одновременно, сколько ждут в очереди и
+# сколько секунд; остальным сразу отвечается, что бот перегружен
+ADMISSION_CHEAP_LIMIT = int(os.getenv("ADMISSION_CHEAP_LIMIT", "20"))
+ADMISSION_EXPENSIVE_LIMIT = int(os.getenv("ADMISSION_EXPENSIVE_LIMIT", "8"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "50"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+
+# Сколько секунд при остановке ждать завершения начатых операций
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "15"))
+
+# Минимальный интервал (сек) между обновлениями таблицы /live в чате
+LIVE_EDIT_INTERVAL = float(os.getenv("LIVE_EDIT_INTERVAL", "5"))
+
+# Уведомления /subscribe: изменения копятся SUBSCRIPTION_BATCH_WINDOW сек
+# и отправляются не быстрее SUBSCRIPTION_SEND_RATE сообщений в секунду
+SUBSCRIPTION_BATCH_WINDOW = float(os.getenv("SUBSCRIPTION_BATCH_WINDOW", "10"))
+SUBSCRIPTION_SEND_RATE = int(os.getenv("SUBSCRIPTION_SEND_RATE", "20"))
+
+# Сколько результатов из одного сообщения отправляется в backend параллельно
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "5"))
+
+# Через сколько секунд без ввода результатов выбранное задание сбрасывается
+# (сессия ввода строками `<команда> <баллы>` завершается)
+SELECTION_IDLE_TIMEOUT = float(os.getenv("SELECTION_IDLE_TIMEOUT", "1800"))
+
+# Количество записей в ответе /history
+HISTORY_LIMIT = 20
+
+# Размер страницы /table: команд (строк) и заданий одного предмета
+TABLE_TEAMS_PER_PAGE = 10
+TABLE_TASKS_PER_PAGE = 6
+# Сколько заданий показывается на одной странице выбора /choose_task
+PICKER_TASKS_PER_PAGE = 20
+
+# Мониторинг event loop и профилирование
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+# Порог блокировки event loop (сек), после которого в лог пишется стек
+SLOW_CALLBACK_THRESHOLD = float(os.getenv("SLOW_CALLBACK_THRESHOLD", "0.25"))
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_MAX_SECONDS = 120
+PROFILE_TOP_N = 30
+# Запись трассы трафика (обновления Telegram и ответы backend) в сжатый
+# JSONL файл для replay.py (пусто - не записывать)
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+
+# Logging
+LOG_FILE = os.getenv("LOG_FILE", "bot.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text или json
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size")  # size или time
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Доля DEBUG записей, попадающих в лог (1.0 - все)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+
 # Data Files
-DATA_DIR = "data"
+DATA_DIR = os.getenv("DATA_DIR", "data")
 ALLOWED_USERS_FILE = os.path.join(DATA_DIR, "allowed_users.txt")
 ALLOWED_GROUPS_FILE = os.path.join(DATA_DIR, "allowed_groups.txt")
 API_TOKEN_FILE = os.path.join(DATA_DIR, "api_token.txt")
 SELECTED_TASKS_FILE = os.path.join(DATA_DIR, "selected_tasks.json")
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "snapshot.json")
+HISTORY_DB_FILE = os.path.join(DATA_DIR, "history.sqlite3")
+LIVE_BOARDS_FILE = os.path.join(DATA_DIR, "live_boards.json")
+SUBSCRIPTIONS_FILE = os.path.join(DATA_DIR, "subscriptions.json")
+
+# Кэш команд, заданий и результатов
+# Время (сек), в течение которого снимок считается свежим
+SNAPSHOT_TTL = float(os.getenv("SNAPSHOT_TTL", "10"))
+# Период фонового обновления снимка для поиска изменений результатов
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "15"))
+# Сколько секунд при старте ждать свежий снимок перед запуском поллинга
+STARTUP_PREFETCH_TIMEOUT = float(os.getenv("STARTUP_PREFETCH_TIMEOUT", "3"))
+# Дублирование запросов снимка: если ответа нет дольше HEDGE_PERCENTILE
+# недавних задержек, отправляется второй такой же запрос. HEDGE_BUDGET -
+# наибольшая доля дублированных запросов (0 - дублирование выключено)
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.05"))
+# Сколько последних задержек учитывать и сколько нужно для включения
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
 
 # IS57 API Data
 SUBJECTS = [
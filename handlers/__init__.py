@@ -1,8 +1,20 @@
 from .basic import router as basic_router
 from .admin import router as admin_router
 from .tasks import router as tasks_router
+from .history import router as history_router
+from .subscriptions import router as subscriptions_router
+from .stats import router as stats_router
+from .table import router as table_router
 
 # Список всех роутеров для регистрации в main.py
-routers = [basic_router, admin_router, tasks_router]
+routers = [
+    basic_router,
+    admin_router,
+    tasks_router,
+    history_router,
+    subscriptions_router,
+    stats_router,
+    table_router,
+]
 
 __all__ = ["routers"]
@@ -1,14 +1,26 @@
+import asyncio
 from aiogram import Router, types
 from aiogram.filters import Command
 from aiogram.enums import ParseMode
 from utils import auth_required, auth_manager
 from api import api_client
-from config.settings import LEGAL_SYMBOLS, BUILDINGS
+from config.settings import (
+    LEGAL_SYMBOLS,
+    BUILDINGS,
+    PROFILE_MAX_SECONDS,
+    PROFILE_SAMPLE_INTERVAL,
+    PROFILE_TOP_N,
+)
 from utils.helpers import validate_name
+from utils.metrics import format_status_summary
+from utils.profiling import profile_event_loop
 import shlex
 
 router = Router()
 
+# Одновременно может работать только один профилировщик
+_profile_lock = asyncio.Lock()
+
 
 @router.message(Command("set_token"))
 @auth_required(admin_only=True)
@@ -114,7 +126,7 @@ async def cmd_remove_group(message: types.Message):
         await message.answer(f"❌ Ошибка при удалении группы: {e}")
 
 
-@router.message(Command("status"))
+@router.message(Command("status"), flags={"cost": "cheap"})
 @auth_required(admin_only=True)
 async def cmd_status(message: types.Message):
     """Показать статус бота (только для админа)"""
@@ -135,6 +147,9 @@ async def cmd_status(message: types.Message):
 {', '.join(str(gid) for gid in allowed_groups[:10]) if allowed_groups else 'Нет'}
 
 **Администратор:** {message.from_user.id}
+
+📈 **Метрики:**
+{format_status_summary()}
 """
 
         await message.answer(status_text, parse_mode=ParseMode.MARKDOWN)
@@ -143,6 +158,51 @@ async def cmd_status(message: types.Message):
         await message.answer(f"❌ Ошибка при получении статуса: {e}")
 
 
+# Профилирование длится дольше обычного дедлайна команды
+@router.message(Command("profile"), flags={"deadline": 0})
+@auth_required(admin_only=True)
+async def cmd_profile(message: types.Message):
+    """Профилирование бота на живом трафике (только для админа)"""
+    try:
+        args = message.text.split()[1:]
+        if not args:
+            await message.answer(
+                "❌ Укажите длительность: `/profile <секунды>`",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+
+        seconds = float(args[0])
+        if not 0 < seconds <= PROFILE_MAX_SECONDS:
+            await message.answer(
+                f"❌ Длительность должна быть от 0 до {PROFILE_MAX_SECONDS} "
+                "секунд."
+            )
+            return
+
+        if _profile_lock.locked():
+            await message.answer("❌ Профилирование уже запущено.")
+            return
+
+        async with _profile_lock:
+            await message.answer(f"⏱ Профилирование на {seconds:g} с...")
+            report = await profile_event_loop(
+                seconds, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N
+            )
+
+        await message.answer_document(
+            types.BufferedInputFile(
+                report.encode("utf-8"), filename="profile.txt"
+            ),
+            caption=f"📊 Top-{PROFILE_TOP_N} функций за {seconds:g} с",
+        )
+
+    except ValueError:
+        await message.answer("❌ Длительность должна быть числом.")
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при профилировании: {e}")
+
+
 @router.message(Command("add_team"))
 @auth_required()
 async def cmd_add_team(message: types.Message):
@@ -178,7 +238,7 @@ async def cmd_add_team(message: types.Message):
         # Проверка на дубликаты
         teams = await api_client.get_teams()
         for team in teams:
-            if team["name"] == name:
+            if team.name == name:
                 await message.answer(
                     "❌ Команда с таким названием уже существует."
                 )
@@ -239,7 +299,7 @@ async def cmd_remove_team(message: types.Message):
             )
             return
 
-        success = await api_client.remove_team(token, team["id"])
+        success = await api_client.remove_team(token, team.id)
         if success:
             await message.answer(f"✅ Команда '{name}' успешно удалена!")
         else:
@@ -6,14 +6,16 @@ from utils import (
     auth_required,
     format_team_info,
     format_task_info,
+    format_team_results,
     split_long_message,
 )
 from config.settings import SUBJECTS, BUILDINGS
+from utils.live import live_boards
 
 router = Router()
 
 
-@router.message(Command("start"))
+@router.message(Command("start"), flags={"cost": "cheap"})
 @auth_required()
 async def cmd_start(message: types.Message):
     """Обработчик команды /start"""
@@ -28,13 +30,14 @@ async def cmd_start(message: types.Message):
 /teams - Получить список команд
 /tasks - Получить список заданий
 /results - Показать таблицу результатов
+/table - Таблица результатов по страницам с кнопками листания
 
 Для получения полного списка команд используйте /help
 """
     await message.answer(welcome_text, parse_mode=ParseMode.MARKDOWN)
 
 
-@router.message(Command("help"))
+@router.message(Command("help"), flags={"cost": "cheap"})
 @auth_required()
 async def cmd_help(message: types.Message):
     """Обработчик команды /help"""
@@ -54,6 +57,11 @@ async def cmd_help(message: types.Message):
 /teams - Получить список всех команд
 /tasks - Получить список всех заданий
 /results - Показать таблицу результатов
+/table - Таблица результатов по страницам с кнопками листания
+/live - Таблица лидеров, обновляемая автоматически
+/live stop - Остановить обновление таблицы лидеров
+/stats - Статистика по предметам: заполненность, средние по зданиям
+/stats <предмет> - Статистика по заданиям: среднее, медиана, максимум
 
 *👥 Команды для работы с командами:*
 /add\\_team <здание - 1 или 3> <название> - Добавить новую команду
@@ -65,6 +73,17 @@ async def cmd_help(message: types.Message):
 
 *📊 Управление результатами:*
 /set\\_result <команда> <предмет> <задание> <баллы> - Установить результат
+/s - То же; под командой можно указать несколько строк `<команда> <баллы>`
+/choose\\_task - Выбрать задание кнопками (или \
+`/choose_task <предмет> <задание>`); потом в личном чате строки \
+`<команда> <баллы>` можно отправлять без /s
+/clear\\_choice - Сбросить выбранное задание
+/history <команда> - История изменений результатов команды
+/history <предмет> <задание> - История изменений результатов задания
+
+*🔔 Уведомления:*
+/subscribe \\[команда|предмет] - Уведомлять чат об изменениях результатов
+/unsubscribe \\[команда|предмет] - Отменить подписку (без аргументов - все)
 
 *📚 Справочная информация:*
 /subjects - Список доступных предметов
@@ -91,7 +110,7 @@ async def cmd_teams(message: types.Message):
             return
 
         # Сортировка как в админке
-        teams.sort(key=lambda x: x["building"], reverse=True)
+        teams.sort(key=lambda x: x.building, reverse=True)
 
         teams_text = "👥 *Список команд:*\n\n"
         for team in teams:
@@ -117,7 +136,7 @@ async def cmd_tasks(message: types.Message):
             return
 
         # Сортировка как в админке
-        tasks.sort(key=lambda x: x["subject"])
+        tasks.sort(key=lambda x: x.subject)
 
         tasks_text = "📝 *Список заданий:*\n\n"
         for task in tasks:
@@ -131,7 +150,7 @@ async def cmd_tasks(message: types.Message):
         await message.answer(f"❌ Ошибка при получении списка заданий: {e}")
 
 
-@router.message(Command("subjects"))
+@router.message(Command("subjects"), flags={"cost": "cheap"})
 @auth_required()
 async def cmd_subjects(message: types.Message):
     """Обработчик команды /subjects"""
@@ -142,7 +161,7 @@ async def cmd_subjects(message: types.Message):
     await message.answer(subjects_text, parse_mode=ParseMode.MARKDOWN)
 
 
-@router.message(Command("buildings"))
+@router.message(Command("buildings"), flags={"cost": "cheap"})
 @auth_required()
 async def cmd_buildings(message: types.Message):
     """Обработчик команды /buildings"""
@@ -158,37 +177,14 @@ async def cmd_buildings(message: types.Message):
 async def cmd_results(message: types.Message):
     """Обработчик команды /results"""
     try:
-        # Получение всех данных
-        teams = await api_client.get_teams()
-        tasks = await api_client.get_tasks()
-        results = await api_client.get_results()
+        # Матрица результатов по текущему снимку
+        matrix = await api_client.get_results_matrix()
 
-        if not teams or not tasks:
+        if not matrix.teams or not matrix.tasks:
             await message.answer("❌ Нет данных для отображения результатов.")
             return
 
-        # Сортировка
-        teams.sort(key=lambda x: x["building"], reverse=True)
-        tasks.sort(key=lambda x: x["subject"])
-
-        # Создание простого списка результатов
-        results_text = "📊 *Результаты команд:*"
-        for team in teams:
-            results_text += (
-                f"\n🏢 *{team['name']} (здание {team['building']}):*\n"
-            )
-            team_total = 0
-
-            for task in tasks:
-                result = api_client.get_team_result(
-                    results, team["id"], task["id"]
-                )
-                if result > 0:
-                    results_text += f"  • {task['subject']}: "
-                    results_text += f"{task['name']} - {result} баллов\n"
-                    team_total += result
-
-            results_text += f"  *Итого: {team_total} баллов*\n"
+        results_text = format_team_results(matrix)
 
         if not results_text.strip():
             await message.answer("📭 Нет результатов для отображения.")
@@ -199,3 +195,24 @@ async def cmd_results(message: types.Message):
 
     except Exception as e:
         await message.answer(f"❌ Ошибка при получении результатов: {e}")
+
+
+@router.message(Command("live"))
+@auth_required()
+async def cmd_live(message: types.Message):
+    """Обработчик команды /live - закрепленная таблица лидеров"""
+    try:
+        args = message.text.split()[1:]
+        if args and args[0].lower() == "stop":
+            if await live_boards.stop(message.chat.id):
+                await message.answer(
+                    "✅ Таблица лидеров больше не обновляется."
+                )
+            else:
+                await message.answer("❌ В этом чате нет таблицы лидеров.")
+            return
+
+        await live_boards.start(message.bot, message.chat.id)
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при создании таблицы лидеров: {e}")
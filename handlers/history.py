@@ -0,0 +1,101 @@
+from datetime import datetime
+from aiogram import Router, types
+from aiogram.filters import Command
+from aiogram.enums import ParseMode
+from api import api_client
+from config.settings import HISTORY_LIMIT, SUBJECTS
+from utils import auth_required, split_long_message
+from utils.history import history_store
+import shlex
+
+router = Router()
+
+
+def format_history_entry(entry: dict, label: str) -> str:
+    """Форматирование записи журнала изменений результатов"""
+    when = datetime.fromtimestamp(entry["ts"]).strftime("%d.%m %H:%M:%S")
+    old_value = "?" if entry["old_value"] is None else entry["old_value"]
+    if entry["source"] == "bot":
+        author = f"пользователь {entry['user_id']}"
+    else:
+        author = "изменено вне бота"
+    return f"{when} {label}: {old_value} → {entry['new_value']} ({author})"
+
+
+@router.message(Command("history"))
+@auth_required()
+async def cmd_history(message: types.Message):
+    """История изменений результатов команды или задания"""
+    try:
+        args = shlex.split(message.text)[1:]
+        if not args:
+            await message.answer(
+                "❌ Использование: `/history <команда>` или "
+                "`/history <предмет> <задание>`",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+
+        teams = await api_client.get_teams()
+        tasks = await api_client.get_tasks()
+        team_names = {team.id: team.name for team in teams}
+        task_names = {
+            task.id: f"{task.name} ({task.subject})"
+            for task in tasks
+        }
+
+        if len(args) >= 2 and args[0].lower() in SUBJECTS:
+            subject = args[0].lower()
+            name = args[1].strip()
+            task = api_client.find_task_by_name_and_subject(
+                tasks, name, subject
+            )
+            if not task:
+                await message.answer("❌ Задание не найдено.")
+                return
+
+            entries = await history_store.task_history(
+                task.id, HISTORY_LIMIT
+            )
+            title = f"📜 История: {task.name} ({task.subject})"
+            lines = [
+                format_history_entry(
+                    entry, team_names.get(entry["team_id"], entry["team_id"])
+                )
+                for entry in entries
+            ]
+        else:
+            team_name = args[0].strip()
+            matches = api_client.find_teams_by_prefix(teams, team_name)
+            if not matches:
+                await message.answer("❌ Команда не найдена.")
+                return
+            if len(matches) > 1:
+                names = ", ".join(t.name for t in matches[:10])
+                await message.answer(
+                    "❌ Найдено несколько команд, начинающихся на '"
+                    f"{team_name}': {names}. Пожалуйста, уточните название."
+                )
+                return
+
+            team = matches[0]
+            entries = await history_store.team_history(
+                team.id, HISTORY_LIMIT
+            )
+            title = f"📜 История: {team.name}"
+            lines = [
+                format_history_entry(
+                    entry, task_names.get(entry["task_id"], entry["task_id"])
+                )
+                for entry in entries
+            ]
+
+        if not lines:
+            await message.answer(f"{title}\n\n📭 Изменений нет.")
+            return
+
+        for part in split_long_message(f"{title}\n\n" + "\n".join(lines)):
+            await message.answer(part)
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при получении истории: {e}")
@@ -0,0 +1,106 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+from api import api_client
+from config.settings import SUBJECTS
+from utils import auth_required, split_long_message
+import shlex
+
+router = Router()
+
+
+def format_building_means(buildings: dict) -> str:
+    """Средние по зданиям одной строкой"""
+    return ", ".join(
+        f"зд. {building}: {mean:.1f}" for building, mean in buildings.items()
+    )
+
+
+def format_subjects_overview(matrix) -> str:
+    """Сводка по всем предметам"""
+    lines = [f"📈 Статистика (команд: {matrix.n_teams})", ""]
+    for subject, stats in matrix.subject_stats().items():
+        cells = stats.tasks * matrix.n_teams
+        fill_rate = stats.filled / cells * 100 if cells else 0
+        lines.append(
+            f"📚 {subject}: заданий {stats.tasks}, "
+            f"заполнено {fill_rate:.0f}%"
+        )
+        lines.append(f"  Средняя сумма команды: {stats.mean_total:.1f}")
+        lines.append(f"  По зданиям: {format_building_means(stats.buildings)}")
+    return "\n".join(lines)
+
+
+def format_subject_tasks(matrix, subject: str) -> str:
+    """Статистика по заданиям одного предмета"""
+    start, end = matrix.subject_slices[subject]
+    lines = [f"📈 Статистика: {subject} (команд: {matrix.n_teams})", ""]
+    for task, stats in zip(
+        matrix.tasks[start:end], matrix.task_stats()[start:end]
+    ):
+        lines.append(f"📝 {task.name}")
+        if not stats.filled:
+            lines.append("  Результатов пока нет")
+            continue
+        lines.append(
+            f"  Заполнено: {stats.filled}/{matrix.n_teams}, "
+            f"среднее {stats.mean:.1f}, медиана {stats.median:g}, "
+            f"максимум {stats.max}"
+        )
+        buildings = {
+            building: mean
+            for building, (count, mean) in stats.buildings.items()
+            if count
+        }
+        lines.append(f"  По зданиям: {format_building_means(buildings)}")
+    return "\n".join(lines)
+
+
+def match_subjects(name: str) -> list:
+    """Предметы по названию из нескольких слов ("английский язык") или
+    его началу ("англ"); точное совпадение имеет приоритет"""
+    name = name.strip().lower()
+    return [s for s in SUBJECTS if s == name] or [
+        s for s in SUBJECTS if s.startswith(name)
+    ]
+
+
+@router.message(Command("stats"))
+@auth_required()
+async def cmd_stats(message: types.Message):
+    """Статистика результатов по предметам и заданиям"""
+    try:
+        name = " ".join(shlex.split(message.text)[1:])
+        subject = None
+        if name:
+            matches = match_subjects(name)
+            if not matches:
+                await message.answer(
+                    "❌ Неизвестный предмет. Доступные предметы: "
+                    f"{', '.join(SUBJECTS)}"
+                )
+                return
+            if len(matches) > 1:
+                await message.answer(
+                    f"❓ Уточните предмет: {', '.join(matches)}"
+                )
+                return
+            subject = matches[0]
+
+        matrix = await api_client.get_results_matrix()
+        if not matrix.teams or not matrix.tasks:
+            await message.answer("❌ Нет данных для статистики.")
+            return
+
+        if subject is None:
+            text = format_subjects_overview(matrix)
+        elif subject not in matrix.subject_slices:
+            await message.answer(f"📭 Нет заданий по предмету {subject}.")
+            return
+        else:
+            text = format_subject_tasks(matrix, subject)
+
+        for part in split_long_message(text):
+            await message.answer(part)
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при получении статистики: {e}")
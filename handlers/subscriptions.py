@@ -0,0 +1,80 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+from api import api_client
+from config.settings import SUBJECTS
+from utils import auth_required
+from utils.subscriptions import subscription_manager
+import shlex
+
+router = Router()
+
+
+async def parse_subscription(message: types.Message, args: list):
+    """Разбор аргументов подписки: (тип, значение, описание) или None"""
+    if not args:
+        return "all", None, "все изменения"
+
+    value = args[0].strip()
+    if value.lower() in SUBJECTS:
+        return "subject", value.lower(), f"предмет {value.lower()}"
+
+    teams = await api_client.get_teams()
+    matches = api_client.find_teams_by_prefix(teams, value)
+    if not matches:
+        await message.answer("❌ Команда или предмет не найдены.")
+        return None
+    if len(matches) > 1:
+        names = ", ".join(t.name for t in matches[:10])
+        await message.answer(
+            "❌ Найдено несколько команд, начинающихся на '"
+            f"{value}': {names}. Пожалуйста, уточните название."
+        )
+        return None
+    return "team", matches[0].id, f"команда {matches[0].name}"
+
+
+@router.message(Command("subscribe"))
+@auth_required()
+async def cmd_subscribe(message: types.Message):
+    """Подписка чата на уведомления об изменениях результатов"""
+    try:
+        args = shlex.split(message.text)[1:]
+        parsed = await parse_subscription(message, args)
+        if parsed is None:
+            return
+
+        kind, value, description = parsed
+        if await subscription_manager.subscribe(message.chat.id, kind, value):
+            await message.answer(f"✅ Подписка оформлена: {description}.")
+        else:
+            await message.answer(f"ℹ️ Подписка уже есть: {description}.")
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при оформлении подписки: {e}")
+
+
+@router.message(Command("unsubscribe"))
+@auth_required()
+async def cmd_unsubscribe(message: types.Message):
+    """Отмена подписки чата (без аргументов - всех подписок)"""
+    try:
+        args = shlex.split(message.text)[1:]
+        if not args:
+            removed = await subscription_manager.unsubscribe(message.chat.id)
+            description = "все подписки"
+        else:
+            parsed = await parse_subscription(message, args)
+            if parsed is None:
+                return
+            kind, value, description = parsed
+            removed = await subscription_manager.unsubscribe(
+                message.chat.id, kind, value
+            )
+
+        if removed:
+            await message.answer(f"✅ Подписка отменена: {description}.")
+        else:
+            await message.answer("❌ Такой подписки нет.")
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при отмене подписки: {e}")
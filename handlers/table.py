@@ -0,0 +1,55 @@
+from aiogram import F, Router, types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command
+from api import api_client
+from utils import auth_required, check_callback_access
+from utils.table import TABLE_CALLBACK, table_pages
+
+router = Router()
+
+
+@router.message(Command("table"))
+@auth_required()
+async def cmd_table(message: types.Message):
+    """Таблица результатов по страницам: команды x задания предмета"""
+    try:
+        matrix = await api_client.get_results_matrix()
+        if not matrix.teams or not matrix.tasks:
+            await message.answer("❌ Нет данных для отображения таблицы.")
+            return
+
+        text, keyboard = table_pages.page(matrix, 0, 0)
+        await message.answer(text, reply_markup=keyboard)
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при получении таблицы: {e}")
+
+
+@router.callback_query(
+    F.data.startswith(f"{TABLE_CALLBACK}:"), flags={"cost": "cheap"}
+)
+async def table_page(callback: types.CallbackQuery):
+    """Листание /table: страница из кэша, сообщение редактируется"""
+    if not await check_callback_access(callback):
+        return
+
+    try:
+        _, team_page, task_page = callback.data.split(":")
+        matrix = await api_client.get_results_matrix()
+        if not matrix.teams or not matrix.tasks:
+            await callback.answer("❌ Нет данных", show_alert=True)
+            return
+
+        text, keyboard = table_pages.page(
+            matrix, int(team_page), int(task_page)
+        )
+        try:
+            await callback.message.edit_text(text, reply_markup=keyboard)
+        except TelegramBadRequest as e:
+            # Страница не изменилась (например, повторное нажатие)
+            if "message is not modified" not in str(e):
+                raise
+        await callback.answer()
+
+    except Exception as e:
+        await callback.answer(f"❌ Ошибка: {e}", show_alert=True)
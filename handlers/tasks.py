@@ -1,15 +1,216 @@
-from aiogram import Router, types
+import asyncio
+from aiogram import F, Router, types
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
-from aiogram.enums import ParseMode
-from utils import auth_required, auth_manager
-from api import api_client
-from config.settings import LEGAL_SYMBOLS, SUBJECTS
+from aiogram.enums import ChatType, ParseMode
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from utils import (
+    auth_required,
+    auth_manager,
+    check_callback_access,
+    split_long_message,
+)
+from api import api_client, SetResultStatus, Task, Team
+from config.settings import BULK_CONCURRENCY, LEGAL_SYMBOLS, SUBJECTS
 from utils.helpers import validate_name
-from utils.selection import selection_manager
+from utils.picker import PICKER_CALLBACK, find_subject, task_picker
+from utils.selection import pending_scores, selection_manager
 import shlex
 
 router = Router()
 
+# Префикс callback data кнопок подтверждения результатов
+CONFIRM_CALLBACK = "sc"
+
+
+def format_choice(task: Task) -> str:
+    """Подтверждение выбора задания (Markdown)"""
+    return (
+        "✅ Вы выбрали задание: "
+        f"{task.name} ({task.subject}). "
+        "Теперь можно использовать `/set_result <команда> <баллы>` "
+        "или просто отправлять строки `<команда> <баллы>` "
+        "(можно несколько строк в одном сообщении). "
+        "Закончить - /clear\\_choice"
+    )
+
+
+def parse_score_lines(lines: list):
+    """Разбор строк вида `<команда> <баллы>`
+
+    Возвращает список пар (название, баллы) и список нераспознанных строк.
+    """
+    entries = []
+    invalid = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        name, _, points = line.rpartition(" ")
+        name = name.strip().strip('"').strip()
+        try:
+            if not name:
+                raise ValueError
+            entries.append((name, int(points)))
+        except ValueError:
+            invalid.append(line)
+    return entries, invalid
+
+
+def resolve_scores(teams: list, entries: list):
+    """Поиск команд для пар (название, баллы)
+
+    Возвращает {id команды: (название из строки, команда, баллы)} -
+    последняя строка для команды имеет приоритет, - а также списки
+    неоднозначных и ненайденных названий.
+    """
+    resolved = {}
+    not_found = []
+    ambiguous = []
+    for name, points in entries:
+        matches = api_client.find_teams_by_prefix(teams, name)
+        if len(matches) == 1:
+            resolved[matches[0].id] = (name, matches[0], points)
+        elif matches:
+            names = ", ".join(t.name for t in matches[:10])
+            ambiguous.append(f"{name} ({names})")
+        else:
+            not_found.append(name)
+    return resolved, ambiguous, not_found
+
+
+async def write_scores(
+    message: types.Message, task: Task, items: list, notes: list
+):
+    """Отправка результатов [(команда, баллы)] и одна сводка в ответ
+
+    Результаты отправляются параллельно (не больше BULK_CONCURRENCY
+    запросов одновременно). notes - разделы сводки о строках, которые
+    не удалось разобрать: [(заголовок, список)].
+    """
+    token = auth_manager.get_api_token()
+    if not token:
+        await message.answer(
+            "❌ API токен не установлен. Обратитесь к администратору."
+        )
+        return
+
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def submit(team: Team, points: int):
+        async with semaphore:
+            return await api_client.set_result(
+                token, team.id, task.id, points
+            )
+
+    statuses = await asyncio.gather(
+        *(submit(team, points) for team, points in items)
+    )
+
+    sections = {
+        SetResultStatus.SET: ("✅ Установлено", []),
+        SetResultStatus.UNCHANGED: ("ℹ️ Уже установлено", []),
+        SetResultStatus.SUPERSEDED: (
+            "ℹ️ Заменено более новым значением из другого запроса",
+            [],
+        ),
+        SetResultStatus.FAILED: ("❌ Ошибка при установке", []),
+    }
+    for (team, points), status in zip(items, statuses):
+        sections[status][1].append(f"{team.name} - {points}")
+    await send_summary(message, task, [*sections.values(), *notes])
+
+
+async def send_summary(message: types.Message, task: Task, sections: list):
+    """Сводка по заданию: непустые разделы [(заголовок, список)]"""
+    summary = [f"📊 Задание: {task.name} ({task.subject})"]
+    for title, names in sections:
+        if names:
+            summary.append(f"\n{title} ({len(names)}):")
+            summary.extend(f"  • {name}" for name in names)
+
+    for part in split_long_message("\n".join(summary)):
+        await message.answer(part)
+
+
+def problem_notes(ambiguous: list, not_found: list, invalid: list) -> list:
+    """Разделы сводки о строках без результата"""
+    return [
+        ("❓ Несколько команд с таким началом", ambiguous),
+        ("❌ Команда не найдена", not_found),
+        ("❌ Не распознаны строки", invalid),
+    ]
+
+
+async def submit_scores(message: types.Message, task: Task, lines: list):
+    """Установка результатов по нескольким строкам `<команда> <баллы>`
+
+    Все строки проверяются по одному снимку списка команд.
+    """
+    entries, invalid = parse_score_lines(lines)
+    teams = await api_client.get_teams()
+    resolved, ambiguous, not_found = resolve_scores(teams, entries)
+    items = [(team, points) for _, team, points in resolved.values()]
+    await write_scores(
+        message, task, items, problem_notes(ambiguous, not_found, invalid)
+    )
+
+
+def parse_bulk_header(header: str):
+    """Разбор первой строки массовой установки результатов
+
+    Возвращает (предмет, задание, строка результата). Предмет и задание -
+    None, если в строке их нет (используется выбранное задание). Если
+    строка заканчивается баллами, это первый результат:
+    `/s <команда> <баллы>` или
+    `/set_result <команда> <предмет> <задание> <баллы>`.
+    """
+    args = shlex.split(header)[1:]
+    # `/s <предмет> <задание>`, даже если название задания - число
+    if len(args) == 2 and args[0].lower() in SUBJECTS:
+        return args[0].lower(), args[1].strip(), None
+    if args and args[-1].lstrip("-").isdigit():
+        if len(args) >= 4 and args[-3].lower() in SUBJECTS:
+            line = " ".join(args[:-3] + args[-1:])
+            return args[-3].lower(), args[-2].strip(), line
+        return None, None, " ".join(args)
+    if len(args) >= 2:
+        return args[0].lower(), args[1].strip(), None
+    return None, None, None
+
+
+async def set_results_bulk(message: types.Message):
+    """Установка результатов сообщением вида `/s [<предмет> <задание>]`
+    и строками `<команда> <баллы>` ниже"""
+    header, *lines = message.text.split("\n")
+    subject, task_name, first_line = parse_bulk_header(header)
+    if first_line is not None:
+        lines.insert(0, first_line)
+    if subject is None:
+        sel = selection_manager.get_selection(message.from_user.id)
+        if not sel:
+            await message.answer(
+                "❌ Укажите задание в первой строке: "
+                "`/s <предмет> <задание>` или выберите его через "
+                "/choose\\_task",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+        selection_manager.touch(message.from_user.id)
+        subject = sel.get("subject")
+        task_name = sel.get("name")
+    elif subject not in SUBJECTS:
+        await message.answer("❌ Неверный предмет. Используйте /subjects.")
+        return
+
+    tasks = await api_client.get_tasks()
+    task = api_client.find_task_by_name_and_subject(tasks, task_name, subject)
+    if not task:
+        await message.answer("❌ Задание не найдено.")
+        return
+
+    await submit_scores(message, task, lines)
+
 
 @router.message(Command("add_task"))
 @auth_required()
@@ -44,7 +245,7 @@ async def cmd_add_task(message: types.Message):
         # Проверка на дубликаты
         tasks = await api_client.get_tasks()
         for task in tasks:
-            if task["name"] == name and task["subject"] == subject:
+            if task.name == name and task.subject == subject:
                 await message.answer(
                     "❌ Задание с таким названием уже существует."
                 )
@@ -104,7 +305,7 @@ async def cmd_remove_task(message: types.Message):
             )
             return
 
-        success = await api_client.remove_task(token, task["id"])
+        success = await api_client.remove_task(token, task.id)
         if success:
             await message.answer(f"✅ Задание '{name}' успешно удалено!")
         else:
@@ -122,9 +323,19 @@ async def cmd_choose_task(message: types.Message):
     """Выбрать задание для последующего использования в /set_result"""
     try:
         args = shlex.split(message.text)[1:]
+        if not args:
+            # Без аргументов - выбор кнопками: предмет, затем задание
+            index = await api_client.get_task_index()
+            if not index.subjects:
+                await message.answer("📭 Заданий пока нет.")
+                return
+            text, keyboard = task_picker.subjects(index)
+            await message.answer(text, reply_markup=keyboard)
+            return
         if len(args) < 2:
             await message.answer(
-                "❌ Использование: `/choose_task <предмет> <название>`",
+                "❌ Использование: `/choose_task <предмет> <название>` "
+                "или `/choose_task` для выбора кнопками",
                 parse_mode=ParseMode.MARKDOWN
             )
             return
@@ -141,17 +352,60 @@ async def cmd_choose_task(message: types.Message):
 
         selection_manager.set_selection(message.from_user.id, task)
         await message.answer(
-            "✅ Вы выбрали задание: "
-            f"{task['name']} ({task['subject']}). "
-            "Теперь можно использовать `/set_result <команда> <баллы>`",
-            parse_mode=ParseMode.MARKDOWN
+            format_choice(task), parse_mode=ParseMode.MARKDOWN
         )
 
     except Exception as e:
         await message.answer(f"❌ Ошибка при выборе задания: {e}")
 
 
-@router.message(Command("clear_choice"))
+@router.callback_query(
+    F.data.startswith(f"{PICKER_CALLBACK}:"), flags={"cost": "cheap"}
+)
+async def choose_task_button(callback: types.CallbackQuery):
+    """Выбор задания кнопками /choose_task"""
+    if not await check_callback_access(callback):
+        return
+
+    try:
+        _, kind, *args = callback.data.split(":", 3)
+        index = await api_client.get_task_index()
+
+        if kind == "t":
+            task = index.by_id.get(int(args[0]))
+            if task is None:
+                await callback.answer(
+                    "❌ Задание удалено, выберите заново", show_alert=True
+                )
+                text, keyboard = task_picker.subjects(index)
+                await callback.message.edit_text(text, reply_markup=keyboard)
+                return
+            selection_manager.set_selection(callback.from_user.id, task)
+            await callback.message.edit_text(
+                format_choice(task), parse_mode=ParseMode.MARKDOWN
+            )
+            await callback.answer()
+            return
+
+        subject = find_subject(index, args[1]) if args else None
+        if subject is not None:
+            screen = task_picker.tasks(index, subject, int(args[0]))
+        else:
+            # Список предметов (в том числе если предмета уже нет)
+            screen = task_picker.subjects(index)
+        text, keyboard = screen
+        try:
+            await callback.message.edit_text(text, reply_markup=keyboard)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                raise
+        await callback.answer()
+
+    except Exception as e:
+        await callback.answer(f"❌ Ошибка: {e}", show_alert=True)
+
+
+@router.message(Command("clear_choice"), flags={"cost": "cheap"})
 @auth_required()
 async def cmd_clear_choice(message: types.Message):
     """Очистить выбранное задание пользователя"""
@@ -168,6 +422,11 @@ async def cmd_clear_choice(message: types.Message):
 async def cmd_set_result(message: types.Message):
     """Установка результата команды"""
     try:
+        # Несколько строк - массовая установка результатов
+        if any(line.strip() for line in message.text.split("\n")[1:]):
+            await set_results_bulk(message)
+            return
+
         args = shlex.split(message.text)[1:]
         # expected usages:
         # /set_result <team> <subject> <task> <points>
@@ -197,6 +456,7 @@ async def cmd_set_result(message: types.Message):
                 )
                 return
 
+            selection_manager.touch(message.from_user.id)
             subject = sel.get("subject")
             task_name = sel.get("name")
             try:
@@ -217,27 +477,21 @@ async def cmd_set_result(message: types.Message):
         teams = await api_client.get_teams()
         tasks = await api_client.get_tasks()
 
-        # Поиск команды и задания
-        team = api_client.find_team_by_name(teams, team_name)
-
-        # Если точного совпадения нет — попробуем найти по префиксу
+        # Поиск команды: точное совпадение или по префиксу
         # (началу названия), нечувствительно к регистру
-        if not team:
-            lc = team_name.lower()
-            prefix_matches = [
-                t for t in teams if t.get("name", "").lower().startswith(lc)
-            ]
-            if len(prefix_matches) == 1:
-                team = prefix_matches[0]
-                team_name = team.get("name")
-            elif len(prefix_matches) > 1:
-                # Если несколько совпадений — попросим уточнить
-                names = ", ".join(t.get("name") for t in prefix_matches[:10])
-                await message.answer(
-                    "❌ Найдено несколько команд, начинающихся на '"
-                    f"{team_name}': {names}. Пожалуйста, уточните название."
-                )
-                return
+        team = None
+        matches = api_client.find_teams_by_prefix(teams, team_name)
+        if len(matches) == 1:
+            team = matches[0]
+            team_name = team.name
+        elif len(matches) > 1:
+            # Если несколько совпадений — попросим уточнить
+            names = ", ".join(t.name for t in matches[:10])
+            await message.answer(
+                "❌ Найдено несколько команд, начинающихся на '"
+                f"{team_name}': {names}. Пожалуйста, уточните название."
+            )
+            return
         task = api_client.find_task_by_name_and_subject(
             tasks, task_name, subject
         )
@@ -263,10 +517,24 @@ async def cmd_set_result(message: types.Message):
             )
             return
 
-        success = await api_client.set_result(
-            token, team["id"], task["id"], points
+        status = await api_client.set_result(
+            token, team.id, task.id, points
         )
-        if success:
+        if status is SetResultStatus.UNCHANGED:
+            await message.answer(
+                f"ℹ️ Результат уже установлен.\n"
+                f"Команда: {team_name}\n"
+                f"Задание: {task_name} ({subject})\n"
+                f"Баллы: {points}"
+            )
+        elif status is SetResultStatus.SUPERSEDED:
+            await message.answer(
+                "ℹ️ Пока запрос ждал очереди, для этой команды и задания "
+                "пришло более новое значение - записано будет оно.\n"
+                f"Команда: {team_name}\n"
+                f"Задание: {task_name} ({subject})"
+            )
+        elif status:
             await message.answer(
                 f"✅ Результат установлен!\n"
                 f"Команда: {team_name}\n"
@@ -282,3 +550,118 @@ async def cmd_set_result(message: types.Message):
         await message.answer("❌ Баллы должны быть числами.")
     except Exception as e:
         await message.answer(f"❌ Ошибка при установке результата: {e}")
+
+
+def in_scoring_session(message: types.Message) -> bool:
+    """Пользователь выбрал задание через /choose_task и может вводить
+    результаты обычными сообщениями (только в личном чате с ботом)"""
+    return (
+        message.from_user is not None
+        and message.chat.type == ChatType.PRIVATE
+        and auth_manager.can_use_bot(message.from_user.id, message.chat.id)
+        and selection_manager.get_selection(message.from_user.id) is not None
+    )
+
+
+@router.message(F.text, ~F.text.startswith("/"), in_scoring_session)
+async def scoring_session_message(message: types.Message):
+    """Строки `<команда> <баллы>` во время сессии ввода результатов
+
+    Если все команды названы точно, результаты записываются сразу. Если
+    какая-то команда найдена только по началу названия, бот показывает,
+    что будет записано, и ждет подтверждения кнопкой.
+    """
+    try:
+        user_id = message.from_user.id
+        sel = selection_manager.get_selection(user_id)
+        tasks = await api_client.get_tasks()
+        task = api_client.find_task_by_name_and_subject(
+            tasks, sel.get("name"), sel.get("subject")
+        )
+        if not task:
+            await message.answer(
+                f"❌ Выбранное задание {sel.get('name')} "
+                f"({sel.get('subject')}) больше не существует, результаты "
+                "не записаны. Выберите задание заново через /choose_task"
+            )
+            return
+
+        entries, invalid = parse_score_lines(message.text.split("\n"))
+        teams = await api_client.get_teams()
+        resolved, ambiguous, not_found = resolve_scores(teams, entries)
+        selection_manager.touch(user_id)
+        notes = problem_notes(ambiguous, not_found, invalid)
+        if not resolved:
+            # Ничего не записано - сообщаем, какие строки не подошли
+            await send_summary(message, task, notes)
+            return
+
+        items = [(team, points) for _, team, points in resolved.values()]
+        exact = [
+            name.lower() == team.name_key
+            for name, team, _ in resolved.values()
+        ]
+        if all(exact):
+            await write_scores(message, task, items, notes)
+            return
+
+        key = pending_scores.add(user_id, (task, items, notes))
+        text = [f"❓ Записать в задание {task.name} ({task.subject})?"]
+        text.extend(
+            f"  • {team.name} - {points}"
+            if is_exact
+            else f"  • {name} → {team.name} - {points}"
+            for (name, team, points), is_exact in zip(
+                resolved.values(), exact
+            )
+        )
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text="✅ Записать",
+                        callback_data=f"{CONFIRM_CALLBACK}:{key}:ok",
+                    ),
+                    InlineKeyboardButton(
+                        text="✖️ Отмена",
+                        callback_data=f"{CONFIRM_CALLBACK}:{key}:no",
+                    ),
+                ]
+            ]
+        )
+        await message.answer("\n".join(text), reply_markup=keyboard)
+
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при установке результатов: {e}")
+
+
+@router.callback_query(F.data.startswith(f"{CONFIRM_CALLBACK}:"))
+async def confirm_scores(callback: types.CallbackQuery):
+    """Подтверждение результатов, команды которых найдены по началу
+    названия"""
+    if not await check_callback_access(callback):
+        return
+
+    try:
+        _, key, action = callback.data.split(":")
+        pending = pending_scores.pop(int(key), callback.from_user.id)
+        if pending is None:
+            await callback.answer(
+                "❌ Подтверждение устарело, отправьте строки заново",
+                show_alert=True,
+            )
+            return
+        if action != "ok":
+            await callback.message.edit_text(
+                "✖️ Отменено, результаты не записаны."
+            )
+            await callback.answer()
+            return
+
+        task, items, notes = pending
+        await callback.message.edit_reply_markup(reply_markup=None)
+        await write_scores(callback.message, task, items, notes)
+        await callback.answer()
+
+    except Exception as e:
+        await callback.answer(f"❌ Ошибка: {e}", show_alert=True)
@@ -1,28 +1,120 @@
 import asyncio
 import logging
 import sys
+import time
+from typing import Optional
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
-from config.settings import BOT_TOKEN
+from config.settings import (
+    BOT_TOKEN,
+    METRICS_HOST,
+    METRICS_PORT,
+    LOOP_LAG_INTERVAL,
+    SLOW_CALLBACK_THRESHOLD,
+    STARTUP_PREFETCH_TIMEOUT,
+    SNAPSHOT_REFRESH_INTERVAL,
+    SHUTDOWN_TIMEOUT,
+    HANDLER_DEADLINE,
+    ADMIN_USER_ID,
+    TRACE_FILE,
+    ADMISSION_CHEAP_LIMIT,
+    ADMISSION_EXPENSIVE_LIMIT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_MAX_WAIT,
+)
 from handlers import routers
 from api import api_client
-from utils import auth_manager
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("bot.log", encoding="utf-8"),
-    ],
+from middlewares import (
+    AdmissionMiddleware,
+    InFlightMiddleware,
+    CorrelationMiddleware,
+    DeadlineMiddleware,
+    UpdateMetricsMiddleware,
+    HandlerMetricsMiddleware,
+    TraceMiddleware,
 )
+from utils import auth_manager
+from utils.admission import AdmissionController
+from utils.health import PollingHeartbeat, health
+from utils.history import history_store
+from utils.http_server import start_http_server
+from utils.lifecycle import in_flight
+from utils.live import live_boards
+from utils.logging_setup import setup_logging
+from utils.profiling import LoopLagMonitor
+from utils.selection import selection_manager
+from utils.subscriptions import notification_sender, subscription_manager
+from utils.trace import trace_recorder
 
 logger = logging.getLogger(__name__)
 
 
+async def _timed(phase: str, awaitable):
+    """Выполнение этапа запуска с логированием его длительности"""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        logger.info(f"Запуск: {phase} - {time.perf_counter() - start:.3f}s")
+
+
+async def _start_metrics_server():
+    """Запуск HTTP сервера метрик (ошибка не мешает работе бота)"""
+    try:
+        return await start_http_server(METRICS_HOST, METRICS_PORT)
+    except OSError as e:
+        logger.error(f"Не удалось запустить HTTP сервер метрик: {e}")
+        return None
+
+
+def create_dispatcher() -> Dispatcher:
+    """Диспетчер с middleware и роутерами бота (также для replay.py)"""
+    dp = Dispatcher()
+
+    # Запись входящих обновлений в трассу (TRACE_FILE)
+    if trace_recorder.enabled:
+        dp.update.outer_middleware(TraceMiddleware())
+
+    # Учет обновлений в обработке, корреляция логов и метрики
+    dp.update.outer_middleware(InFlightMiddleware())
+    dp.update.outer_middleware(CorrelationMiddleware())
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    # Ограничение числа одновременно выполняемых команд
+    admission = AdmissionMiddleware(
+        {
+            cost: AdmissionController(
+                cost, limit, ADMISSION_QUEUE_SIZE, ADMISSION_MAX_WAIT
+            )
+            for cost, limit in (
+                ("cheap", ADMISSION_CHEAP_LIMIT),
+                ("expensive", ADMISSION_EXPENSIVE_LIMIT),
+            )
+        }
+    )
+    # Метрики, допуск и дедлайн для команд и нажатий inline-кнопок
+    for observer in (dp.message, dp.callback_query):
+        observer.middleware(HandlerMetricsMiddleware())
+        observer.middleware(admission)
+        observer.middleware(DeadlineMiddleware(HANDLER_DEADLINE))
+
+    # Регистрация роутеров
+    for router in routers:
+        dp.include_router(router)
+
+    return dp
+
+
+def setup_listeners(bot: Bot):
+    """Журнал изменений результатов, таблицы лидеров /live и подписки"""
+    api_client.add_results_listener(history_store.record)
+    api_client.add_results_listener(live_boards.on_results_changed)
+    api_client.add_results_listener(subscription_manager.on_results_changed)
+    live_boards.bot = bot
+    notification_sender.bot = bot
+
+
 async def main():
     """Основная функция запуска бота"""
     # Проверка токена бота
@@ -30,25 +122,45 @@ async def main():
         logger.error("BOT_TOKEN не установлен! Проверьте файл .env")
         return
 
+    # Запись трассы трафика для replay.py
+    if TRACE_FILE:
+        trace_recorder.start(TRACE_FILE, admin_user_id=ADMIN_USER_ID)
+        logger.info(f"Запись трассы в {TRACE_FILE}")
+
     # Создание бота и диспетчера
     bot = Bot(
         token=BOT_TOKEN,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
 
-    dp = Dispatcher()
+    # Отметка успешных getUpdates для /healthz
+    bot.session.middleware(PollingHeartbeat(health))
 
-    # Регистрация роутеров
-    for router in routers:
-        dp.include_router(router)
+    dp = create_dispatcher()
+
+    startup_started = time.perf_counter()
 
-    # Загрузка данных авторизации
-    logger.info("Загрузка данных авторизации...")
-    await auth_manager.load_data()
+    setup_listeners(bot)
 
-    # Информация о запуске
+    # Последний известный снимок данных: бот может отвечать сразу,
+    # пока свежие данные загружаются с backend
+    snapshot_loaded = api_client.load_snapshot()
+    if snapshot_loaded:
+        logger.info("Загружен сохраненный снимок команд/заданий/результатов")
+    prefetch = asyncio.create_task(
+        _timed("загрузка снимка с backend", api_client.prefetch_snapshot())
+    )
+
+    # Независимые этапы запуска выполняются параллельно
+    metrics_server = asyncio.create_task(
+        _timed("HTTP сервер метрик", _start_metrics_server())
+    )
     try:
-        bot_info = await bot.get_me()
+        bot_info, _, http_runner = await asyncio.gather(
+            _timed("информация о боте", bot.me()),
+            _timed("данные авторизации", auth_manager.load_data()),
+            metrics_server,
+        )
         logger.info(
             f"Бот запущен: @{bot_info.username} ({bot_info.first_name})"
         )
@@ -67,22 +179,103 @@ async def main():
 
     except Exception as e:
         logger.error(f"Ошибка при получении информации о боте: {e}")
+        prefetch.cancel()
+        # Сервер метрик мог успеть запуститься - его тоже нужно закрыть
+        await asyncio.wait({metrics_server})
+        http_runner = None
+        if not metrics_server.cancelled() and not metrics_server.exception():
+            http_runner = metrics_server.result()
+        await shutdown(bot, None, http_runner)
         return
 
+    # Без сохраненного снимка свежий ждем ограниченное время, дальше
+    # он догрузится в фоне. С сохраненным снимком бот отвечает сразу
+    if not snapshot_loaded:
+        done, _ = await asyncio.wait(
+            {prefetch}, timeout=STARTUP_PREFETCH_TIMEOUT
+        )
+        if not done:
+            logger.warning(
+                "Снимок с backend не загружен за "
+                f"{STARTUP_PREFETCH_TIMEOUT}s, загрузка продолжается в фоне"
+            )
+    logger.info(
+        f"Запуск завершен за {time.perf_counter() - startup_started:.3f}s"
+    )
+
+    # Мониторинг задержки event loop
+    loop_monitor = LoopLagMonitor(LOOP_LAG_INTERVAL, SLOW_CALLBACK_THRESHOLD)
+    loop_monitor.start()
+    health.loop_monitor = loop_monitor
+
+    # Фоновое обновление снимка: изменения результатов замечаются
+    # без запросов пользователей
+    refresh_task = asyncio.create_task(
+        api_client.refresh_loop(SNAPSHOT_REFRESH_INTERVAL)
+    )
+
     try:
-        # Запуск поллинга
+        # Запуск поллинга (SIGTERM/SIGINT останавливают получение обновлений)
         logger.info("Запуск поллинга...")
-        await dp.start_polling(bot)
+        await dp.start_polling(bot, close_bot_session=False)
     except Exception as e:
         logger.error(f"Ошибка при запуске поллинга: {e}")
     finally:
-        # Закрытие ресурсов
-        logger.info("Завершение работы бота...")
-        await api_client.close()
-        await bot.session.close()
+        refresh_task.cancel()
+        prefetch.cancel()
+        await shutdown(bot, loop_monitor, http_runner)
+
+
+async def shutdown(
+    bot: Bot, loop_monitor: Optional[LoopLagMonitor], http_runner
+):
+    """Корректное завершение работы
+
+    Дожидается обработки уже полученных обновлений и запросов на запись
+    в backend (не дольше SHUTDOWN_TIMEOUT), сохраняет данные на диск и
+    только потом закрывает соединения.
+    """
+    shutdown_started = time.perf_counter()
+    pending = in_flight.pending()
+    logger.info(
+        f"Завершение работы бота, операций в процессе: {len(pending)}..."
+    )
+
+    abandoned = await in_flight.drain(SHUTDOWN_TIMEOUT)
+    if abandoned:
+        logger.warning(
+            f"Не завершены за {SHUTDOWN_TIMEOUT}s и прерваны: "
+            + "; ".join(abandoned)
+        )
+
+    # Сохранение данных на диск
+    await selection_manager.flush()
+    await auth_manager.flush()
+    await live_boards.flush()
+    await subscription_manager.flush()
+    await api_client.flush()
+    await history_store.close()
+    trace_recorder.stop()
+
+    # Закрытие ресурсов
+    if loop_monitor:
+        await loop_monitor.stop()
+    if http_runner:
+        await http_runner.cleanup()
+    await api_client.close()
+    await bot.session.close()
+
+    logger.info(
+        f"Бот остановлен за {time.perf_counter() - shutdown_started:.3f}s, "
+        f"завершено операций: {len(pending) - len(abandoned)}, "
+        f"прервано: {len(abandoned)}"
+    )
 
 
 if __name__ == "__main__":
+    # Настройка логирования
+    log_listener = setup_logging()
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -90,3 +283,5 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Критическая ошибка: {e}")
         sys.exit(1)
+    finally:
+        log_listener.stop()
@@ -0,0 +1,16 @@
+from .admission import AdmissionMiddleware
+from .deadline import DeadlineMiddleware
+from .lifecycle import InFlightMiddleware
+from .logging import CorrelationMiddleware
+from .metrics import UpdateMetricsMiddleware, HandlerMetricsMiddleware
+from .trace import TraceMiddleware
+
+__all__ = [
+    "AdmissionMiddleware",
+    "DeadlineMiddleware",
+    "InFlightMiddleware",
+    "CorrelationMiddleware",
+    "UpdateMetricsMiddleware",
+    "HandlerMetricsMiddleware",
+    "TraceMiddleware",
+]
@@ -0,0 +1,50 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from utils.admission import AdmissionController, Overloaded
+
+logger = logging.getLogger(__name__)
+
+BUSY_TEXT = "⏳ Бот сейчас перегружен, попробуйте повторить команду позже."
+
+
+class AdmissionMiddleware(BaseMiddleware):
+    """Допуск обработчиков по классам стоимости (inner middleware)
+
+    Флаг обработчика cost выбирает контроллер: cheap - команды без
+    запросов к backend, expensive (по умолчанию) - все остальные. Так
+    наплыв тяжелых команд не задерживает /help и /subjects. Если
+    допуска нет, пользователь сразу получает ответ о перегрузке.
+    """
+
+    def __init__(self, controllers: Dict[str, AdmissionController]):
+        self.controllers = controllers
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        cost = get_flag(data, "cost", default="expensive")
+        controller = self.controllers[cost]
+        try:
+            await controller.acquire()
+        except Overloaded:
+            logger.warning(
+                f"Обновление отклонено: перегрузка ({cost}, "
+                f"выполняется {controller.active}, "
+                f"ожидает {controller.waiting})"
+            )
+            if isinstance(event, Message):
+                await event.answer(BUSY_TEXT)
+            elif isinstance(event, CallbackQuery):
+                await event.answer(BUSY_TEXT, show_alert=True)
+            return None
+
+        try:
+            return await handler(event, data)
+        finally:
+            controller.release()
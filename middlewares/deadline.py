@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from utils.deadline import deadline_var
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+deadline_exceeded = metrics.counter(
+    "is57bot_handler_deadline_exceeded_total",
+    "Обработчики, прерванные по истечении дедлайна",
+    ["handler"],
+)
+
+BACKEND_SLOW_TEXT = (
+    "⏳ Сервер is57.ru отвечает слишком долго, команда прервана. "
+    "Проверьте результат (/results) и при необходимости повторите команду."
+)
+
+
+class DeadlineMiddleware(BaseMiddleware):
+    """Ограничение времени обработки команды (inner middleware)
+
+    Дедлайн передается запросам к API через deadline_var: они получают
+    оставшееся время как таймаут. Когда время выходит, обработчик
+    отменяется, а пользователь сразу получает ответ о медленном
+    backend. Флаг обработчика deadline задает свой бюджет (0 - без
+    ограничения).
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        budget = get_flag(data, "deadline", default=self.budget)
+        if not budget:
+            return await handler(event, data)
+
+        deadline = time.monotonic() + budget
+        token = deadline_var.set(deadline)
+        try:
+            return await asyncio.wait_for(handler(event, data), budget)
+        except asyncio.TimeoutError:
+            if time.monotonic() < deadline:
+                # Таймаут внутри обработчика, а не дедлайн
+                raise
+            name = getattr(
+                getattr(data.get("handler"), "callback", None),
+                "__name__",
+                "unknown",
+            )
+            deadline_exceeded.inc(handler=name)
+            logger.warning(f"Обработчик {name} прерван через {budget}s")
+            if isinstance(event, Message):
+                await event.answer(BACKEND_SLOW_TEXT)
+            elif isinstance(event, CallbackQuery):
+                await event.answer(BACKEND_SLOW_TEXT, show_alert=True)
+        finally:
+            deadline_var.reset(token)
@@ -0,0 +1,18 @@
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from utils.lifecycle import in_flight
+
+
+class InFlightMiddleware(BaseMiddleware):
+    """Регистрация обрабатываемых обновлений для корректного завершения"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        update_id = event.update_id if isinstance(event, Update) else None
+        with in_flight.track(f"update {update_id}"):
+            return await handler(event, data)
@@ -0,0 +1,52 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from utils.metrics import (
+    handler_errors,
+    handler_latency,
+    updates_in_flight,
+    updates_total,
+)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Учет обновлений в обработке (outer middleware для dp.update)"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        updates_total.inc()
+        updates_in_flight.inc()
+        try:
+            return await handler(event, data)
+        finally:
+            updates_in_flight.dec()
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Время выполнения и ошибки обработчиков (inner middleware)"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = getattr(
+            getattr(handler_object, "callback", None), "__name__", "unknown"
+        )
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors.inc(handler=name)
+            raise
+        finally:
+            handler_latency.observe(
+                time.perf_counter() - start, handler=name
+            )
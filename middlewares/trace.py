@@ -0,0 +1,20 @@
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from utils.trace import trace_recorder
+
+
+class TraceMiddleware(BaseMiddleware):
+    """Запись входящих обновлений в трассу (outer middleware)"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            trace_recorder.record_update(
+                event.model_dump(mode="json", exclude_none=True)
+            )
+        return await handler(event, data)
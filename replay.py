@@ -0,0 +1,409 @@
+"""Воспроизведение трассы трафика и сравнение производительности
+
+Трасса записывается ботом при заданном TRACE_FILE. Воспроизведение
+подает записанные обновления в Dispatcher с исходными интервалами
+(или ускоренно), backend заменяется локальным сервером с ответами из
+трассы, запросы к Telegram не отправляются. Итоги сохраняются в JSON,
+и два прогона (например, до и после изменения) можно сравнить:
+
+    python replay.py run trace.jsonl.gz --speed 10 -o before.json
+    python replay.py compare before.json after.json
+"""
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple, get_args
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.types import Chat, Message, Update, User
+from aiohttp import web
+
+REPLAY_BOT_TOKEN = "123456:replay"
+
+
+class BackendStandIn:
+    """Локальная замена back.is57.ru с ответами из трассы
+
+    Запросы чтения (JSON эндпоинты) получают последнее тело, записанное
+    не позже текущего момента трассы now, поэтому данные меняются так
+    же, как менялись при записи. Запросы записи получают записанные
+    ответы на те же параметры по порядку. Задержка ответа - записанная.
+    """
+
+    def __init__(self, records: List[Dict], latency: bool = True):
+        self.latency = latency
+        # Момент трассы последнего поданного обновления
+        self.now = 0.0
+        self.requests = 0
+        by_endpoint: Dict[str, List[Dict]] = defaultdict(list)
+        for record in records:
+            by_endpoint[record["endpoint"]].append(record)
+        self._reads = {
+            endpoint: endpoint_records
+            for endpoint, endpoint_records in by_endpoint.items()
+            if any(
+                r["content_type"] == "application/json"
+                for r in endpoint_records
+            )
+        }
+        self._writes: Dict[Tuple, Deque[Dict]] = defaultdict(deque)
+        self._last_write: Dict[str, Dict] = {}
+        for endpoint, endpoint_records in by_endpoint.items():
+            if endpoint in self._reads:
+                continue
+            for record in endpoint_records:
+                key = (endpoint, self._params_key(record["params"]))
+                self._writes[key].append(record)
+                self._last_write[endpoint] = record
+
+    @staticmethod
+    def _params_key(params: Dict) -> Tuple:
+        return tuple(
+            sorted(
+                (name, str(value))
+                for name, value in params.items()
+                if name != "token"
+            )
+        )
+
+    def _pick_read(self, endpoint: str) -> Tuple[Dict, Optional[Dict]]:
+        """Запись для задержки и запись с телом на момент now"""
+        records = self._reads[endpoint]
+        timing = records[0]
+        body = next((r for r in records if r["body"] is not None), None)
+        for record in records:
+            if record["t"] > self.now:
+                break
+            timing = record
+            if record["body"] is not None and record["status"] == 200:
+                body = record
+        return timing, body
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        endpoint = request.path
+        if endpoint in self._reads:
+            timing, record = self._pick_read(endpoint)
+        else:
+            queued = self._writes.get(
+                (endpoint, self._params_key(dict(request.query)))
+            )
+            record = timing = (
+                queued.popleft() if queued else self._last_write.get(endpoint)
+            )
+            if record is None:
+                return web.Response(text="ok")
+
+        if self.latency:
+            await asyncio.sleep(timing["latency"])
+        if record is None or record["body"] is None:
+            return web.Response(status=timing["status"])
+        return web.Response(
+            text=record["body"],
+            status=record["status"],
+            content_type=record["content_type"] or "text/plain",
+        )
+
+    async def start(self) -> Tuple[web.AppRunner, str]:
+        """Запуск на свободном локальном порту; возвращает runner и URL"""
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        await web.SockSite(runner, sock).start()
+        host, port = sock.getsockname()
+        return runner, f"http://{host}:{port}"
+
+
+class ReplaySession(BaseSession):
+    """Сессия бота без сети: запросы к Bot API только считаются"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot: Bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        returning = method.__returning__
+        if returning is Message or Message in get_args(returning):
+            chat_id = getattr(method, "chat_id", None)
+            chat_id = chat_id if isinstance(chat_id, int) else 0
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=chat_id, type="private"),
+                text=getattr(method, "text", None),
+            ).as_(bot)
+        if returning is User:
+            return User(id=0, is_bot=True, first_name="replay")
+        if returning is bool:
+            return True
+        return None
+
+    async def stream_content(
+        self,
+        url,
+        headers=None,
+        timeout=30,
+        chunk_size=65536,
+        raise_for_status=True,
+    ):
+        yield b""
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    """Первая запись трассы (параметры бота при записи)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        record = json.loads(f.readline() or "{}")
+    return record if record.get("type") == "meta" else {}
+
+
+def update_label(update: Update) -> str:
+    """Группа обновления для отчета: команда, text или тип события"""
+    message = update.message
+    if message is not None and message.text:
+        if message.text.startswith("/"):
+            return message.text.split()[0].split("@")[0]
+        return "text"
+    if update.callback_query is not None:
+        data = update.callback_query.data or ""
+        return f"callback:{data.split(':')[0]}"
+    return update.event_type
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Сводка задержек в секундах"""
+    ordered = sorted(latencies)
+
+    def quantile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 6),
+        "p50": round(quantile(0.5), 6),
+        "p95": round(quantile(0.95), 6),
+        "p99": round(quantile(0.99), 6),
+        "max": round(ordered[-1], 6),
+    }
+
+
+async def replay(path: str, speed: float, latency: bool) -> Dict[str, Any]:
+    """Воспроизведение трассы path; возвращает отчет"""
+    # Модули бота читают настройки при импорте - окружение уже задано
+    from api import api_client
+    from config.settings import SNAPSHOT_REFRESH_INTERVAL
+    from main import create_dispatcher, setup_listeners
+    from utils import auth_manager
+    from utils.history import history_store
+    from utils.selection import selection_manager
+    from utils.trace import read_trace
+
+    records = list(read_trace(path))
+    backend = BackendStandIn(
+        [r for r in records if r["type"] == "backend"], latency
+    )
+    runner, api_client.base_url = await backend.start()
+
+    session = ReplaySession()
+    bot = Bot(
+        token=REPLAY_BOT_TOKEN,
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    updates = [
+        (
+            r["t"],
+            Update.model_validate(r["update"], context={"bot": bot}),
+        )
+        for r in records
+        if r["type"] == "update"
+    ]
+    if not updates:
+        raise SystemExit("В трассе нет обновлений")
+
+    # Все участники трассы получают доступ, как при записи
+    for _, update in updates:
+        event = update.message or update.callback_query
+        if event is None:
+            continue
+        auth_manager.allowed_users.add(event.from_user.id)
+        chat = getattr(event, "chat", None) or event.message.chat
+        if chat.id < 0:
+            auth_manager.allowed_groups.add(chat.id)
+    auth_manager.api_token = "replay"
+
+    dp = create_dispatcher()
+    setup_listeners(bot)
+    await api_client.prefetch_snapshot()
+    refresh_task = None
+    if speed > 0:
+        refresh_task = asyncio.create_task(
+            api_client.refresh_loop(SNAPSHOT_REFRESH_INTERVAL / speed)
+        )
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+
+    async def feed(label: str, update: Update):
+        start = time.perf_counter()
+        try:
+            await dp.feed_update(bot, update)
+        except Exception as e:
+            errors[label] += 1
+            logging.getLogger(__name__).error(f"{label}: {e}")
+        finally:
+            latencies[label].append(time.perf_counter() - start)
+
+    first = updates[0][0]
+    started = time.monotonic()
+    tasks = []
+    for t, update in updates:
+        if speed > 0:
+            delay = (t - first) / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        backend.now = t
+        tasks.append(asyncio.create_task(feed(update_label(update), update)))
+    await asyncio.gather(*tasks)
+    duration = time.monotonic() - started
+
+    if refresh_task is not None:
+        refresh_task.cancel()
+    await selection_manager.flush()
+    await api_client.flush()
+    await history_store.close()
+    await api_client.close()
+    await runner.cleanup()
+
+    return {
+        "trace": path,
+        "speed": speed,
+        "updates": len(updates),
+        "duration": round(duration, 3),
+        "throughput": round(len(updates) / duration, 3),
+        "errors": sum(errors.values()),
+        "latency": summarize(
+            [value for values in latencies.values() for value in values]
+        ),
+        "commands": {
+            label: summarize(values)
+            for label, values in sorted(latencies.items())
+        },
+        "telegram_calls": dict(sorted(session.calls.items())),
+        "backend_requests": backend.requests,
+    }
+
+
+def compare(base: Dict, new: Dict, threshold: float) -> bool:
+    """Таблица различий двух отчетов; True, если есть регрессии"""
+    rows = [("throughput, upd/s", base["throughput"], new["throughput"], 1)]
+    for q in ("p50", "p95", "p99"):
+        rows.append(
+            (f"latency {q}, ms", base["latency"][q] * 1000,
+             new["latency"][q] * 1000, -1)
+        )
+    for label in sorted(set(base["commands"]) & set(new["commands"])):
+        for q in ("p50", "p95"):
+            rows.append(
+                (f"{label} {q}, ms", base["commands"][label][q] * 1000,
+                 new["commands"][label][q] * 1000, -1)
+            )
+
+    regressed = False
+    print(f"{'':<32} {'base':>10} {'new':>10} {'change':>8}")
+    for name, old, current, direction in rows:
+        change = (current - old) / old * 100 if old else 0.0
+        worse = -change * direction > threshold
+        regressed = regressed or worse
+        print(
+            f"{name:<32} {old:>10.1f} {current:>10.1f} {change:>+7.1f}%"
+            + (" !" if worse else "")
+        )
+    if base["errors"] != new["errors"]:
+        print(f"Ошибки обработки: {base['errors']} -> {new['errors']}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="воспроизвести трассу")
+    run.add_argument("trace", help="файл трассы (TRACE_FILE)")
+    run.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="ускорение относительно записи (0 - без пауз)",
+    )
+    run.add_argument(
+        "--no-latency",
+        action="store_true",
+        help="отвечать без записанных задержек backend",
+    )
+    run.add_argument("-o", "--output", help="куда сохранить отчет JSON")
+
+    diff = commands.add_parser("compare", help="сравнить два отчета")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="допустимое ухудшение, %% (иначе код возврата 1)",
+    )
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    # Данные воспроизведения не смешиваются с данными бота
+    data_dir = tempfile.mkdtemp(prefix="is57bot-replay-")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["TRACE_FILE"] = ""
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["ADMIN_USER_ID"] = str(
+        read_meta(args.trace).get("admin_user_id", 0)
+    )
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        report = asyncio.run(
+            replay(args.trace, args.speed, not args.no_latency)
+        )
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
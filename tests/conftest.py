@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Данные бота (авторизация, выбор заданий) - во временной директории
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="is57bot-tests-")
+os.environ["ADMIN_USER_ID"] = "42"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from utils.admission import AdmissionController, Overloaded
+
+
+def test_acquire_within_limit_and_release():
+    async def run():
+        controller = AdmissionController("cheap", 2, 1, 1)
+        await controller.acquire()
+        await controller.acquire()
+        assert controller.active == 2
+        controller.release()
+        controller.release()
+        return controller.active
+
+    assert asyncio.run(run()) == 0
+
+
+def test_queue_full_is_rejected_immediately():
+    async def run():
+        controller = AdmissionController("cheap", 1, 1, 1)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await controller.acquire()
+        controller.release()
+        await waiter
+        assert controller.active == 1
+
+    asyncio.run(run())
+
+
+def test_max_wait_rejects_and_leaves_queue():
+    async def run():
+        controller = AdmissionController("expensive", 1, 5, 0.02)
+        await controller.acquire()
+        with pytest.raises(Overloaded):
+            await controller.acquire()
+        assert controller.waiting == 0
+        controller.release()
+        return controller.active
+
+    assert asyncio.run(run()) == 0
+
+
+def test_release_hands_slot_to_waiters_in_order():
+    async def run():
+        controller = AdmissionController("cheap", 1, 5, 1)
+        order = []
+
+        async def handler(name):
+            await controller.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            controller.release()
+
+        await controller.acquire()
+        tasks = [asyncio.create_task(handler(n)) for n in "abc"]
+        await asyncio.sleep(0)
+        # Новый обработчик не обгоняет ожидающих, даже если место есть
+        assert controller.waiting == 3
+        controller.release()
+        await asyncio.gather(*tasks)
+        return order, controller.active
+
+    assert asyncio.run(run()) == (["a", "b", "c"], 0)
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def run():
+        controller = AdmissionController("cheap", 1, 5, 1)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.waiting == 0
+        controller.release()
+        return controller.active
+
+    assert asyncio.run(run()) == 0
+
+
+def test_cancel_after_handoff_does_not_leak_slot():
+    async def run():
+        controller = AdmissionController("cheap", 1, 5, 1)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        # Место передается, и сразу же отменяется ожидание
+        controller.release()
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Отмена победила - место возвращено
+            return controller.active
+        # Допуск победил - место у обработчика, он его освободит
+        assert controller.active == 1
+        controller.release()
+        return controller.active
+
+    assert asyncio.run(run()) == 0
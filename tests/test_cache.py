@@ -0,0 +1,143 @@
+import os
+
+from api.cache import (
+    ConditionalRequest,
+    SnapshotCache,
+    Validators,
+    diff_cells,
+)
+from api.models import Task, Team
+
+
+def changed(changes):
+    return {
+        (c.team_id, c.task_id): (c.old_value, c.new_value) for c in changes
+    }
+
+
+def test_first_score_of_new_task_is_reported():
+    # Задание 20 без результатов в /results отсутствует совсем
+    old = {(1, 10): 5}
+    new = {(1, 10): 5, (1, 20): 7}
+    assert changed(diff_cells(old, new)) == {(1, 20): (0, 7)}
+    assert changed(diff_cells(old, new, {1}, {10, 20})) == {(1, 20): (0, 7)}
+
+
+def test_first_score_of_new_team_is_reported():
+    old = {(1, 10): 5}
+    new = {(1, 10): 5, (2, 10): 3}
+    assert changed(diff_cells(old, new, {1, 2}, {10})) == {(2, 10): (0, 3)}
+
+
+def test_changed_and_cleared_cells():
+    old = {(1, 10): 5, (1, 11): 4, (2, 10): 1}
+    new = {(1, 10): 6, (2, 10): 1}
+    assert changed(diff_cells(old, new, {1, 2}, {10, 11})) == {
+        (1, 10): (5, 6),
+        (1, 11): (4, 0),
+    }
+
+
+def test_removed_team_and_task_are_not_changes():
+    old = {(1, 10): 5, (1, 11): 4, (2, 10): 1, (2, 11): 2}
+    # Удалены команда 2 и задание 11
+    new = {(1, 10): 5}
+    assert diff_cells(old, new, {1}, {10}) == []
+    # Без снимков /teams и /tasks - по ячейкам нового снимка
+    assert diff_cells(old, new) == []
+
+
+def test_added_team_without_scores_is_not_a_change():
+    old = {(1, 10): 5}
+    new = {(1, 10): 5, (2, 10): 0}
+    assert diff_cells(old, new, {1, 2}, {10}) == []
+
+
+def test_conditional_request_sends_previous_validators():
+    previous = Validators('"v1"', "Mon, 19 Oct 2026 10:00:00 GMT", "d")
+    assert ConditionalRequest(previous).headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 19 Oct 2026 10:00:00 GMT",
+    }
+    assert ConditionalRequest(Validators()).headers() == {}
+
+
+def test_conditional_request_not_modified_keeps_validators():
+    previous = Validators('"v1"', None, "d")
+    request = ConditionalRequest(previous)
+    request.not_modified()
+    assert request.result == "not_modified"
+    assert request.current == previous
+
+
+def digest_of(chunks, previous=Validators()):
+    request = ConditionalRequest(previous)
+    for chunk in chunks:
+        request.update(chunk)
+    request.finish({"ETag": '"v2"'})
+    return request
+
+
+def test_conditional_request_compares_body_hash():
+    first = digest_of([b'{"1": ', b"{}}"])
+    assert first.result == "changed"
+    assert first.current.etag == '"v2"'
+
+    # То же тело другими частями - без изменений, даже если ETag новый
+    same = digest_of([b'{"1": {}}'], first.current)
+    assert same.result == "unchanged"
+
+    other = digest_of([b'{"2": {}}'], first.current)
+    assert other.result == "changed"
+    assert other.current.digest != first.current.digest
+
+
+def test_touch_refreshes_only_current_generation(tmp_path):
+    cache = SnapshotCache(str(tmp_path / "snapshot.json"), ttl=0)
+    assert not cache.touch("results", 0)
+    cache.set("results", {})
+    generation = cache.generation("results")
+    cache.patch("results", {(1, 10): 5})
+    # Тело не изменилось, но после начала загрузки была локальная правка
+    assert not cache.touch("results", generation)
+    assert cache.touch("results", cache.generation("results"))
+
+
+def test_set_is_dropped_after_discard_or_patch(tmp_path):
+    cache = SnapshotCache(str(tmp_path / "snapshot.json"), ttl=60)
+    assert cache.get("teams") == (None, False)
+    generation = cache.generation("teams")
+    cache.discard("teams")
+    # Загрузка, начатая до сброса, устарела
+    assert not cache.set("teams", [], generation)
+    assert cache.get("teams") == (None, False)
+    assert cache.set("teams", [], cache.generation("teams"))
+    assert cache.get("teams") == ([], True)
+
+
+def test_saved_snapshot_loads_stale(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    cache = SnapshotCache(path, ttl=60)
+    cache.set("teams", [Team(1, "Альфа", 57)])
+    cache.set("tasks", [Task(10, "A1", "Алгебра")])
+    cache.set("results", {(1, 10): 5})
+    cache.save()
+    assert not os.path.exists(f"{path}.tmp")
+
+    loaded = SnapshotCache(path, ttl=60)
+    assert loaded.load()
+    teams, fresh = loaded.get("teams")
+    assert not fresh
+    assert [(t.id, t.name, t.building) for t in teams] == [(1, "Альфа", 57)]
+    tasks, _ = loaded.get("tasks")
+    assert [(t.id, t.subject) for t in tasks] == [(10, "алгебра")]
+    assert loaded.get("results") == ({(1, 10): 5}, False)
+
+
+def test_load_missing_or_broken_snapshot(tmp_path):
+    path = tmp_path / "snapshot.json"
+    assert not SnapshotCache(str(path), ttl=60).load()
+    path.write_text("{broken")
+    cache = SnapshotCache(str(path), ttl=60)
+    assert not cache.load()
+    assert cache.get("results") == (None, False)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from api import decoding
+from api.decoding import ResultsStreamParser, loads
+from api.models import parse_results
+
+BODY = json.dumps(
+    {
+        "1": {"results": [{"taskInfo": {"id": 10}, "result": 3}]},
+        # Строки и вложенные объекты похожи на границу элементов
+        "2": {
+            "name": '}, "3": {',
+            "results": [
+                {"taskInfo": {"id": 10, "x": {"y": 1}}, "result": 5},
+                {"taskInfo": {"id": 11}, "result": -1},
+            ],
+        },
+        "3": {"results": []},
+        "4": {"results": [{"taskInfo": {}, "result": 7}]},
+        "5": {"results": [{"taskInfo": {"id": 12}, "result": 2.5}]},
+    },
+    indent=1,
+).encode()
+
+
+def parse(body, size):
+    parser = ResultsStreamParser()
+    for i in range(0, len(body), size):
+        parser.feed(body[i:i + size])
+    return parser.close()
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, len(BODY)])
+def test_stream_matches_full_parse(size):
+    assert parse(BODY, size) == parse_results(json.loads(BODY))
+
+
+def test_parsed_entries_are_dropped_from_buffer():
+    parser = ResultsStreamParser()
+    parser.feed(BODY[:-20])
+    assert len(parser._buffer) < len(BODY) // 2
+    assert 1 in {team_id for team_id, _ in parser.results}
+    parser.feed(BODY[-20:])
+    assert parser.close() == parse_results(json.loads(BODY))
+
+
+def test_empty_object_and_leading_whitespace():
+    assert parse(b"  \n{ }", 1) == {}
+
+
+def test_invalid_body_raises():
+    with pytest.raises(ValueError):
+        parse(b'{"1": {"results": [}', 4)
+
+
+def test_loads_without_orjson(monkeypatch):
+    monkeypatch.setattr(decoding, "orjson", None)
+    assert loads(b'{"a": [1, "\\u044f"]}') == {"a": [1, "я"]}
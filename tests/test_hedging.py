@@ -0,0 +1,88 @@
+import asyncio
+
+from api.hedging import HedgePolicy
+
+
+def make_policy(budget=1.0, burst=10.0):
+    policy = HedgePolicy(0.5, budget, window=10, min_samples=3, burst=burst)
+    for _ in range(3):
+        policy.record("/results", 0.01)
+    return policy
+
+
+class Attempts:
+    """Попытки запроса: задержка и ответ каждой по порядку запуска."""
+
+    def __init__(self, *plan):
+        self.plan = list(plan)
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        delay, result = self.plan[self.started]
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return result
+
+
+def test_delay_needs_min_samples_and_uses_percentile():
+    policy = HedgePolicy(0.5, 1.0, window=4, min_samples=3)
+    policy.record("/teams", 0.3)
+    policy.record("/teams", 0.1)
+    assert policy.delay("/teams") is None
+    policy.record("/teams", 0.2)
+    assert policy.delay("/teams") == 0.2
+    # В окне только последние window задержек
+    for latency in (0.5, 0.6, 0.7):
+        policy.record("/teams", latency)
+    assert policy.delay("/teams") == 0.6
+    assert HedgePolicy(0.5, 0, 4, 0).delay("/teams") is None
+
+
+def test_slow_attempt_is_hedged_and_loser_cancelled():
+    policy = make_policy()
+    attempts = Attempts((1, "first"), (0, "second"))
+    result = asyncio.run(policy.run("/results", attempts))
+    assert result == "second"
+    assert attempts.started == 2
+    assert attempts.cancelled == 1
+
+
+def test_fast_attempt_is_not_hedged():
+    policy = make_policy()
+    attempts = Attempts((0, "first"), (0, "second"))
+    assert asyncio.run(policy.run("/results", attempts)) == "first"
+    assert attempts.started == 1
+
+
+def test_budget_limits_hedged_share():
+    # Каждый запрос добавляет 0.5 токена: дублируется каждый второй
+    policy = make_policy(budget=0.5)
+
+    async def run():
+        started = 0
+        for _ in range(4):
+            attempts = Attempts((0.05, "first"), (0, "second"))
+            await policy.run("/results", attempts)
+            started += attempts.started
+        return started
+
+    assert asyncio.run(run()) == 6
+
+
+def test_failed_attempt_does_not_cancel_the_other():
+    policy = make_policy()
+    attempts = Attempts((0.05, "first"), (0, None))
+    assert asyncio.run(policy.run("/results", attempts)) == "first"
+    assert attempts.cancelled == 0
+
+
+def test_all_attempts_failed():
+    policy = make_policy()
+    attempts = Attempts((0.05, None), (0, None))
+    assert asyncio.run(policy.run("/results", attempts)) is None
+    assert attempts.started == 2
@@ -0,0 +1,71 @@
+import asyncio
+
+from api.cache import ResultChange
+from api.client import IS57APIClient
+from utils.lifecycle import InFlightTracker, in_flight
+
+
+def test_drain_waits_for_operations_started_while_draining():
+    tracker = InFlightTracker()
+    finished = []
+
+    async def notify():
+        with tracker.track("notify"):
+            await asyncio.sleep(0.05)
+            finished.append("notify")
+
+    async def write():
+        with tracker.track("write"):
+            await asyncio.sleep(0.05)
+            finished.append("write")
+        # Как уведомления после записи в backend
+        asyncio.create_task(notify())
+        await asyncio.sleep(0)
+
+    async def run():
+        task = asyncio.create_task(write())
+        await asyncio.sleep(0)
+        abandoned = await tracker.drain(1.0)
+        await task
+        return abandoned
+
+    assert asyncio.run(run()) == []
+    assert finished == ["write", "notify"]
+
+
+def test_drain_cancels_after_timeout():
+    tracker = InFlightTracker()
+
+    async def slow():
+        with tracker.track("slow"):
+            await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(slow())
+        await asyncio.sleep(0)
+        abandoned = await tracker.drain(0.05)
+        await asyncio.sleep(0)
+        return abandoned, task.cancelled()
+
+    assert asyncio.run(run()) == (["slow"], True)
+
+
+def test_results_listeners_are_drained():
+    client = IS57APIClient()
+    received = []
+
+    async def listener(changes):
+        await asyncio.sleep(0.05)
+        received.extend(changes)
+
+    async def run():
+        client.add_results_listener(listener)
+        change = ResultChange(1, 10, 0, 5)
+        client._notify_results_listeners([change])
+        assert len(client._listener_tasks) == 1
+        assert await in_flight.drain(1.0) == []
+        await asyncio.sleep(0)
+        assert not client._listener_tasks
+
+    asyncio.run(run())
+    assert len(received) == 1
@@ -0,0 +1,21 @@
+import asyncio
+import json
+
+from utils.live import LiveBoardManager
+
+
+def test_live_board_saves_keep_last_state(tmp_path):
+    path = tmp_path / "live_boards.json"
+
+    async def run():
+        manager = LiveBoardManager(str(path), 1.0)
+        for chat_id in range(10):
+            manager._boards[chat_id] = chat_id + 100
+            asyncio.ensure_future(manager._save())
+        del manager._boards[5]
+        await manager._save()
+        await manager.flush()
+
+    asyncio.run(run())
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert sorted(map(int, data)) == [i for i in range(10) if i != 5]
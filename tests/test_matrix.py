@@ -0,0 +1,60 @@
+import pytest
+
+from api import matrix as matrix_module
+from api.matrix import ResultsMatrix
+from api.models import Task, Team
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_task_stats_max_of_negative_scores(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(matrix_module, "np", None)
+    elif matrix_module.np is None:
+        pytest.skip("numpy не установлен")
+    teams = [Team(1, "10В", 1), Team(2, "9А", 1)]
+    tasks = [
+        Task(10, "Задача 1", "математика"),
+        Task(11, "Задача 2", "математика"),
+        Task(12, "Задача 3", "математика"),
+    ]
+    results = {(1, 10): -5, (2, 10): -2, (1, 11): 3}
+    matrix = ResultsMatrix.from_snapshot(teams, tasks, results)
+
+    stats = matrix.task_stats()
+    assert stats[0].max == -2
+    assert stats[1].max == 3
+    # Задание без результатов
+    assert stats[2].max == 0
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_totals_and_ranks(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(matrix_module, "np", None)
+    elif matrix_module.np is None:
+        pytest.skip("numpy не установлен")
+    teams = [Team(1, "10В", 1), Team(2, "9А", 3), Team(3, "8Б", 1)]
+    tasks = [
+        Task(10, "Задача 1", "математика"),
+        Task(11, "Задача 2", "физика"),
+        Task(12, "Задача 3", "математика"),
+    ]
+    results = {(1, 10): 5, (1, 11): 2, (2, 12): 7, (3, 10): 3, (3, 11): 4}
+    matrix = ResultsMatrix.from_snapshot(teams, tasks, results)
+    matrix.set(3, 11, 9)
+
+    # Строки матрицы упорядочены по-своему - сравниваем по командам
+    names = [team.name for team in matrix.teams]
+
+    def by_team(values):
+        return dict(zip(names, values))
+
+    assert by_team(matrix.team_totals()) == {"10В": 7, "9А": 7, "8Б": 12}
+    subject_totals = matrix.subject_totals()
+    assert by_team(subject_totals["математика"]) == {
+        "10В": 5,
+        "9А": 7,
+        "8Б": 3,
+    }
+    assert by_team(subject_totals["физика"]) == {"10В": 2, "9А": 0, "8Б": 9}
+    assert by_team(matrix.ranks()) == {"8Б": 1, "10В": 2, "9А": 2}
@@ -0,0 +1,37 @@
+from api.models import Task, TaskIndex
+from utils.picker import find_subject, subject_key, task_picker
+
+
+def button_data(keyboard):
+    return [b.callback_data for row in keyboard.inline_keyboard for b in row]
+
+
+def test_subject_button_survives_snapshot_change():
+    old = TaskIndex([Task(1, "Задача 1", "физика")])
+    _, keyboard = task_picker.subjects(old)
+    data = button_data(keyboard)[0]
+
+    # В новом снимке перед физикой появился другой предмет
+    new = TaskIndex(
+        [Task(2, "Задача 2", "математика"), Task(1, "Задача 1", "физика")]
+    )
+    key = data.split(":", 3)[3]
+    assert find_subject(new, key) == "физика"
+
+
+def test_removed_subject_is_not_found():
+    old = TaskIndex([Task(1, "Задача 1", "физика")])
+    new = TaskIndex([Task(2, "Задача 2", "математика")])
+    key = subject_key(old.subjects[0])
+    assert find_subject(new, key) is None
+
+
+def test_long_subject_fits_callback_data():
+    subject = "очень длинное название предмета: " * 3
+    index = TaskIndex([Task(1, "Задача 1", subject)])
+    _, keyboard = task_picker.subjects(index)
+    _, tasks_keyboard = task_picker.tasks(index, subject, 0)
+    for data in button_data(keyboard) + button_data(tasks_keyboard):
+        assert len(data.encode()) <= 64
+    key = button_data(keyboard)[0].split(":", 3)[3]
+    assert find_subject(index, key) == subject
@@ -0,0 +1,15 @@
+from handlers.stats import match_subjects
+
+
+def test_multi_word_subject():
+    assert match_subjects("Английский язык") == ["английский язык"]
+
+
+def test_subject_prefix():
+    assert match_subjects("англ") == ["английский язык"]
+    assert match_subjects("мат") == ["математика"]
+
+
+def test_ambiguous_and_unknown_subjects():
+    assert match_subjects("ли") == ["лингвистика", "литература"]
+    assert match_subjects("русский язык") == []
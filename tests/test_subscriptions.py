@@ -0,0 +1,21 @@
+import asyncio
+import json
+
+from utils.subscriptions import RateLimitedSender, SubscriptionManager
+
+
+def test_subscription_saves_keep_last_state(tmp_path):
+    path = tmp_path / "subscriptions.json"
+
+    async def run():
+        manager = SubscriptionManager(str(path), 1.0, RateLimitedSender(10))
+        await asyncio.gather(
+            *(manager.subscribe(chat_id, "all") for chat_id in range(20)),
+            manager.unsubscribe(3),
+        )
+        await manager.flush()
+
+    asyncio.run(run())
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert sorted(map(int, data)) == [i for i in range(20) if i != 3]
+    assert not (tmp_path / "subscriptions.json.tmp").exists()
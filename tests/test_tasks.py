@@ -0,0 +1,102 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from aiogram.types import Message
+
+from api.models import Task
+from config.settings import SELECTION_IDLE_TIMEOUT
+from handlers.tasks import in_scoring_session, parse_bulk_header
+from utils import selection
+from utils.selection import selection_manager
+
+ADMIN_ID = 42
+
+
+def make_message(chat_id: int, chat_type: str, text: str = "10 5"):
+    return Message.model_validate(
+        {
+            "message_id": 1,
+            "date": 1700000000,
+            "chat": {"id": chat_id, "type": chat_type},
+            "from": {"id": ADMIN_ID, "is_bot": False, "first_name": "A"},
+            "text": text,
+        }
+    )
+
+
+def select_task():
+    async def select():
+        selection_manager.set_selection(
+            ADMIN_ID, Task(1, "Задача 1", "математика")
+        )
+        await selection_manager.flush()
+
+    asyncio.run(select())
+
+
+def test_bulk_header_with_task():
+    assert parse_bulk_header('/s математика "Задача 1"') == (
+        "математика",
+        "Задача 1",
+        None,
+    )
+
+
+def test_bulk_header_is_first_score_line():
+    # `/s <команда> <баллы>` и строки ниже - то же задание из выбора
+    assert parse_bulk_header("/s 10В 85") == (None, None, "10В 85")
+    assert parse_bulk_header("/s 9А Знатоки -3") == (
+        None,
+        None,
+        "9А Знатоки -3",
+    )
+
+
+def test_bulk_header_full_set_result():
+    header = '/set_result "9А Знатоки" математика "Задача 1" 7'
+    assert parse_bulk_header(header) == (
+        "математика",
+        "Задача 1",
+        "9А Знатоки 7",
+    )
+
+
+def test_bulk_header_numeric_task_name():
+    assert parse_bulk_header("/s математика 5") == ("математика", "5", None)
+
+
+def test_bulk_header_without_args():
+    assert parse_bulk_header("/s") == (None, None, None)
+
+
+def test_scoring_session_in_private_chat():
+    select_task()
+    assert in_scoring_session(make_message(ADMIN_ID, "private"))
+
+
+def test_group_message_is_not_scoring_session():
+    # Обычная переписка в группе судей не должна становиться записью
+    select_task()
+    assert not in_scoring_session(make_message(-100500, "supergroup"))
+    assert not in_scoring_session(make_message(-500, "group"))
+
+
+def test_expired_session(monkeypatch):
+    select_task()
+    later = time.time() + SELECTION_IDLE_TIMEOUT + 1
+    monkeypatch.setattr(selection, "time", SimpleNamespace(time=lambda: later))
+    assert selection_manager.get_selection(ADMIN_ID) is None
+    assert not in_scoring_session(make_message(ADMIN_ID, "private"))
+
+
+def test_selection_without_timestamp_is_kept(tmp_path, monkeypatch):
+    # Выбор, сохраненный до появления used_at, не сбрасывается
+    path = tmp_path / "selected_tasks.json"
+    path.write_text(
+        '{"7": {"task_id": 1, "subject": "математика", "name": "Задача 1"}}',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(selection, "SELECTED_TASKS_FILE", str(path))
+    manager = selection.SelectionManager()
+    assert manager.get_selection(7)["task_id"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+import gzip
+
+from aiogram.types import Update
+
+from middlewares.trace import TraceMiddleware
+from utils.trace import read_trace, trace_recorder
+
+TOKEN = "s3cret-api-token"
+
+
+def make_update(text: str, entities: list) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 1700000000,
+                "chat": {"id": 42, "type": "private"},
+                "from": {"id": 42, "is_bot": False, "first_name": "A"},
+                "text": text,
+                "entities": entities,
+            },
+        }
+    )
+
+
+async def handler(event, data):
+    return None
+
+
+def test_set_token_is_not_recorded(tmp_path):
+    path = str(tmp_path / "trace.jsonl.gz")
+    trace_recorder.start(path)
+    try:
+        update = make_update(
+            f"/set_token {TOKEN}",
+            [
+                {"type": "bot_command", "offset": 0, "length": 10},
+                {"type": "url", "offset": 11, "length": len(TOKEN)},
+            ],
+        )
+        asyncio.run(TraceMiddleware()(handler, update, {}))
+    finally:
+        trace_recorder.stop()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert TOKEN not in f.read()
+    updates = [r for r in read_trace(path) if r["type"] == "update"]
+    assert len(updates) == 1
+    message = updates[0]["update"]["message"]
+    assert message["text"].startswith("/set_token ")
+    assert [e["type"] for e in message["entities"]] == ["bot_command"]
+
+
+def test_other_commands_are_recorded(tmp_path):
+    path = str(tmp_path / "trace.jsonl.gz")
+    trace_recorder.start(path)
+    try:
+        update = make_update(
+            "/s 10В 85", [{"type": "bot_command", "offset": 0, "length": 2}]
+        )
+        asyncio.run(TraceMiddleware()(handler, update, {}))
+    finally:
+        trace_recorder.stop()
+
+    updates = [r for r in read_trace(path) if r["type"] == "update"]
+    assert updates[0]["update"]["message"]["text"] == "/s 10В 85"
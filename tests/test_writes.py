@@ -0,0 +1,121 @@
+import asyncio
+
+from api.writes import KeyedWriteQueue
+
+SUPERSEDED = "superseded"
+
+
+class Backend:
+    """Запись в backend: сохраняет значения и отвечает "set"."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.writes = []
+        self.active = 0
+        self.max_active = 0
+
+    def write(self, key, value):
+        async def run():
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            await asyncio.sleep(self.delay)
+            self.writes.append((key, value))
+            self.active -= 1
+            return f"set {value}"
+
+        return run
+
+
+def test_last_writer_wins_and_same_value_is_not_superseded():
+    backend = Backend()
+
+    async def run():
+        queue = KeyedWriteQueue(SUPERSEDED)
+        futures = [
+            queue.submit("cell", value, backend.write("cell", value))
+            for value in (5, 5, 7, 9, 5)
+        ]
+        return await asyncio.gather(*futures)
+
+    results = asyncio.run(run())
+    assert backend.writes == [("cell", 5)]
+    assert results == ["set 5", "set 5", SUPERSEDED, SUPERSEDED, "set 5"]
+
+
+def test_writes_of_one_key_are_sequential():
+    backend = Backend()
+
+    async def run():
+        queue = KeyedWriteQueue(SUPERSEDED)
+        first = queue.submit("cell", 1, backend.write("cell", 1))
+        await asyncio.sleep(0.001)  # первая запись уже выполняется
+        second = queue.submit("cell", 2, backend.write("cell", 2))
+        third = queue.submit("cell", 3, backend.write("cell", 3))
+        return await asyncio.gather(first, second, third)
+
+    results = asyncio.run(run())
+    assert results == ["set 1", SUPERSEDED, "set 3"]
+    assert backend.writes == [("cell", 1), ("cell", 3)]
+    assert backend.max_active == 1
+
+
+def test_duplicate_of_running_write_joins_it():
+    backend = Backend()
+
+    async def run():
+        queue = KeyedWriteQueue(SUPERSEDED)
+        first = queue.submit("cell", 4, backend.write("cell", 4))
+        await asyncio.sleep(0.001)
+        second = queue.submit("cell", 4, backend.write("cell", 4))
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run()) == ["set 4", "set 4"]
+    assert backend.writes == [("cell", 4)]
+
+
+def test_different_keys_run_in_parallel():
+    backend = Backend()
+
+    async def run():
+        queue = KeyedWriteQueue(SUPERSEDED)
+        return await asyncio.gather(
+            *(
+                queue.submit(key, 1, backend.write(key, 1))
+                for key in ("a", "b", "c")
+            )
+        )
+
+    assert asyncio.run(run()) == ["set 1"] * 3
+    assert backend.max_active == 3
+
+
+def test_error_reaches_writes_of_the_same_value():
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("backend")
+
+    async def run():
+        queue = KeyedWriteQueue(SUPERSEDED)
+        futures = [
+            queue.submit("cell", 5, fail),
+            queue.submit("cell", 6, fail),
+            queue.submit("cell", 5, fail),
+        ]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    first, second, third = asyncio.run(run())
+    assert isinstance(first, RuntimeError)
+    assert second == SUPERSEDED
+    assert isinstance(third, RuntimeError)
+
+
+def test_queue_is_empty_after_writes():
+    backend = Backend()
+
+    async def run():
+        queue = KeyedWriteQueue(SUPERSEDED)
+        await queue.submit("cell", 1, backend.write("cell", 1))
+        await asyncio.sleep(0)
+        return queue.pending("cell")
+
+    assert asyncio.run(run()) is False
@@ -1,9 +1,12 @@
 from .auth import auth_manager
 from .helpers import (
     auth_required,
+    check_callback_access,
     format_team_info,
     format_task_info,
     format_results_table,
+    format_team_results,
+    format_scoreboard,
     validate_name,
     split_long_message,
 )
@@ -11,9 +14,12 @@ from .helpers import (
 __all__ = [
     "auth_manager",
     "auth_required",
+    "check_callback_access",
     "format_team_info",
     "format_task_info",
     "format_results_table",
+    "format_team_results",
+    "format_scoreboard",
     "validate_name",
     "split_long_message",
 ]
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque
+from utils.metrics import metrics
+
+admission_active = metrics.gauge(
+    "is57bot_admission_active",
+    "Выполняющиеся обработчики по классам стоимости",
+    ["cost"],
+)
+admission_queue_depth = metrics.gauge(
+    "is57bot_admission_queue_depth",
+    "Обновления, ожидающие допуска к обработке",
+    ["cost"],
+)
+admission_wait = metrics.histogram(
+    "is57bot_admission_wait_seconds",
+    "Время ожидания допуска к обработке",
+    ["cost"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+admission_rejected = metrics.counter(
+    "is57bot_admission_rejected_total",
+    "Отклоненные из-за перегрузки обновления: queue_full, timeout",
+    ["cost", "reason"],
+)
+
+
+class Overloaded(Exception):
+    """Обновление не допущено к обработке из-за перегрузки"""
+
+
+class AdmissionController:
+    """Ограничение числа одновременно выполняющихся обработчиков
+
+    Сверх limit обработчики ждут в очереди в порядке поступления. Если
+    в очереди уже queue_size ожидающих или допуска нет дольше max_wait
+    секунд, acquire бросает Overloaded: лишняя нагрузка отбрасывается
+    сразу, а не копится в памяти и запросах к backend.
+    """
+
+    def __init__(
+        self, cost: str, limit: int, queue_size: int, max_wait: float
+    ):
+        self.cost = cost
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Получение места для обработчика (или Overloaded)"""
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            admission_active.set(self._active, cost=self.cost)
+            admission_wait.observe(0, cost=self.cost)
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            admission_rejected.inc(cost=self.cost, reason="queue_full")
+            raise Overloaded(self.cost)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        admission_queue_depth.set(len(self._waiters), cost=self.cost)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait or None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Место передано одновременно с отменой - возвращаем его
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                admission_rejected.inc(cost=self.cost, reason="timeout")
+                raise Overloaded(self.cost) from None
+            raise
+        finally:
+            admission_queue_depth.set(len(self._waiters), cost=self.cost)
+            admission_wait.observe(time.monotonic() - start, cost=self.cost)
+
+    def release(self):
+        """Освобождение места; оно сразу передается первому ожидающему"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+        admission_active.set(self._active, cost=self.cost)
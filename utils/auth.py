@@ -1,5 +1,6 @@
+import asyncio
 import os
-from typing import List, Set
+from typing import List, Optional, Set, Tuple
 from config.settings import (
     ADMIN_USER_ID,
     ALLOWED_USERS_FILE,
@@ -16,6 +17,9 @@ class AuthManager:
         self.allowed_users: Set[int] = set()
         self.allowed_groups: Set[int] = set()
         self.api_token: str = ""
+        # Данные, которые еще не записаны на диск
+        self._unsaved: Set[str] = set()
+        self._save_task: Optional[asyncio.Task] = None
         self._ensure_data_directory()
 
     def _ensure_data_directory(self):
@@ -62,30 +66,72 @@ class AuthManager:
         except Exception as e:
             print(f"Ошибка загрузки API токена: {e}")
 
+    @staticmethod
+    def _write_file(path: str, content: str):
+        """Запись файла через временный (выполняется в отдельном потоке)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _file_content(self, name: str) -> Tuple[str, str]:
+        """Путь и текущее содержимое файла данных name"""
+        if name == "users":
+            return ALLOWED_USERS_FILE, "\n".join(
+                str(uid) for uid in self.allowed_users
+            )
+        if name == "groups":
+            return ALLOWED_GROUPS_FILE, "\n".join(
+                str(gid) for gid in self.allowed_groups
+            )
+        return API_TOKEN_FILE, self.api_token
+
+    async def _save(self, *names: str):
+        """Запись файлов данных одной фоновой задачей
+
+        Пока задача пишет, новые изменения только помечаются и попадают
+        в следующий проход, поэтому записи не перемешиваются и на диске
+        всегда оказывается последнее состояние.
+        """
+        self._unsaved.update(names)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_loop())
+        # Отмена обработчика не должна прерывать запись
+        await asyncio.shield(self._save_task)
+
+    async def _save_loop(self):
+        failed: Set[str] = set()
+        while self._unsaved - failed:
+            name = min(self._unsaved - failed)
+            self._unsaved.discard(name)
+            path, content = self._file_content(name)
+            try:
+                await asyncio.to_thread(self._write_file, path, content)
+            except Exception as e:
+                # Останется несохраненным до следующего flush
+                self._unsaved.add(name)
+                failed.add(name)
+                print(f"Ошибка сохранения {path}: {e}")
+
     async def save_allowed_users(self):
         """Сохранение списка разрешенных пользователей"""
-        try:
-            with open(ALLOWED_USERS_FILE, "w") as f:
-                f.write("\n".join(str(uid) for uid in self.allowed_users))
-        except Exception as e:
-            print(f"Ошибка сохранения разрешенных пользователей: {e}")
+        await self._save("users")
 
     async def save_allowed_groups(self):
         """Сохранение списка разрешенных групп"""
-        try:
-            with open(ALLOWED_GROUPS_FILE, "w") as f:
-                f.write("\n".join(str(gid) for gid in self.allowed_groups))
-        except Exception as e:
-            print(f"Ошибка сохранения разрешенных групп: {e}")
+        await self._save("groups")
 
     async def save_api_token(self, token: str):
         """Сохранение API токена"""
-        try:
-            self.api_token = token
-            with open(API_TOKEN_FILE, "w") as f:
-                f.write(token)
-        except Exception as e:
-            print(f"Ошибка сохранения API токена: {e}")
+        self.api_token = token
+        await self._save("token")
+
+    async def flush(self):
+        """Запись данных, которые еще не сохранены или не сохранились"""
+        if self._save_task is not None:
+            await self._save_task
+        if self._unsaved:
+            await self._save()
 
     def is_admin(self, user_id: int) -> bool:
         """Проверка является ли пользователь администратором"""
@@ -0,0 +1,17 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# Момент (time.monotonic), к которому должна завершиться обработка
+# текущего обновления (выставляется DeadlineMiddleware)
+deadline_var: ContextVar[Optional[float]] = ContextVar(
+    "deadline", default=None
+)
+
+
+def remaining() -> Optional[float]:
+    """Сколько секунд осталось до дедлайна (None - дедлайна нет)"""
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
@@ -0,0 +1,78 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import GetUpdates
+from api import api_client
+from config.settings import (
+    HEALTH_MAX_LOOP_LAG,
+    HEALTH_MAX_POLLING_AGE,
+    READY_MAX_BACKEND_AGE,
+)
+from utils.auth import auth_manager
+from utils.profiling import LoopLagMonitor
+
+Check = Tuple[bool, Dict[str, Any]]
+
+
+def _age(moment: Optional[float]) -> Optional[float]:
+    return None if moment is None else round(time.monotonic() - moment, 3)
+
+
+class PollingHeartbeat(BaseRequestMiddleware):
+    """Отметка успешных запросов getUpdates (middleware сессии бота)"""
+
+    def __init__(self, monitor: "HealthMonitor"):
+        self.monitor = monitor
+
+    async def __call__(self, make_request, bot, method):
+        response = await make_request(bot, method)
+        if isinstance(method, GetUpdates):
+            self.monitor.last_poll = time.monotonic()
+        return response
+
+
+class HealthMonitor:
+    """Состояние бота для /healthz и /readyz
+
+    Проверки только читают уже известные отметки времени: опоздание
+    event loop из LoopLagMonitor, последний успешный getUpdates и
+    последний успешный ответ backend (его обновляет фоновая загрузка
+    снимка). Поэтому частые проверки не создают запросов к backend.
+    """
+
+    def __init__(self):
+        self.loop_monitor: Optional[LoopLagMonitor] = None
+        # До первого getUpdates отсчет идет от запуска
+        self.last_poll = time.monotonic()
+
+    def liveness(self) -> Check:
+        """Работает ли event loop и получение обновлений"""
+        details: Dict[str, Any] = {"polling_age": _age(self.last_poll)}
+        ok = details["polling_age"] <= HEALTH_MAX_POLLING_AGE
+        if self.loop_monitor is not None:
+            monitor = self.loop_monitor
+            details["loop_lag"] = round(monitor.last_lag, 3)
+            ok = (
+                ok
+                and monitor.last_lag <= HEALTH_MAX_LOOP_LAG
+                and monitor.heartbeat_age
+                <= monitor.interval + HEALTH_MAX_LOOP_LAG
+            )
+        return ok, details
+
+    def readiness(self) -> Check:
+        """Может ли бот выполнять команды: есть токен и backend отвечает"""
+        backend_age = _age(api_client.last_success)
+        details = {
+            "api_token": bool(auth_manager.get_api_token()),
+            "backend_age": backend_age,
+        }
+        ok = (
+            details["api_token"]
+            and backend_age is not None
+            and backend_age <= READY_MAX_BACKEND_AGE
+        )
+        return ok, details
+
+
+health = HealthMonitor()
@@ -1,6 +1,7 @@
 import logging
 from functools import wraps
 from aiogram import types
+from api.models import Results, Task, Team
 from utils.auth import auth_manager
 
 logger = logging.getLogger(__name__)
@@ -42,48 +43,61 @@ def auth_required(admin_only: bool = False):
     return decorator
 
 
-def format_team_info(team: dict) -> str:
+async def check_callback_access(callback: types.CallbackQuery) -> bool:
+    """Проверка авторизации для нажатия inline-кнопки
+
+    При отказе пользователь получает уведомление.
+    """
+    message = callback.message
+    if message is not None and auth_manager.can_use_bot(
+        callback.from_user.id, message.chat.id
+    ):
+        return True
+    await callback.answer("❌ Нет доступа", show_alert=True)
+    return False
+
+
+def format_team_info(team: Team) -> str:
     """Форматирование информации о команде"""
-    return f"🏢 {team['name']} (здание {team['building']}) - ID: {team['id']}"
+    return f"🏢 {team.name} (здание {team.building}) - ID: {team.id}"
 
 
-def format_task_info(task: dict) -> str:
+def format_task_info(task: Task) -> str:
     """Форматирование информации о задании"""
-    return f"📝 {task['name']} ({task['subject']}) - ID: {task['id']}"
+    return f"📝 {task.name} ({task.subject}) - ID: {task.id}"
 
 
-def format_results_table(teams: list, tasks: list, results: dict) -> str:
-    """Форматирование таблицы результатов для отправки в Telegram"""
-    if not teams or not tasks:
+def format_results_table(matrix) -> str:
+    """Форматирование таблицы результатов для отправки в Telegram
+
+    matrix - ResultsMatrix; команды и задания в ней уже отсортированы
+    как в админке.
+    """
+    if not matrix.teams or not matrix.tasks:
         return "❌ Нет данных для отображения таблицы результатов."
 
     # Заголовок таблицы
     table = "📊 *Таблица результатов*\n"
 
-    # Сортировка команд и заданий как в админке
-    teams_sorted = sorted(teams, key=lambda x: x["building"], reverse=True)
-    tasks_sorted = sorted(tasks, key=lambda x: x["subject"])
-
     # Создание таблицы
     # Заголовок с названиями команд
     table += "| Задание | "
-    for team in teams_sorted:
-        table += f"{team['name'][:8]} | "
+    for team in matrix.teams:
+        table += f"{team.name[:8]} | "
     table += "\n"
 
     # Разделитель
     table += "|" + "-" * 10 + "|"
-    for _ in teams_sorted:
+    for _ in matrix.teams:
         table += "-" * 10 + "|"
     table += "\n"
 
     # Строки с результатами
-    for task in tasks_sorted:
-        task_name = f"{task['name'][:8]}"
+    for j, task in enumerate(matrix.tasks):
+        task_name = f"{task.name[:8]}"
         table += f"| {task_name} | "
 
-        for team in teams_sorted:
-            result = get_team_task_result(results, team["id"], task["id"])
+        for result in matrix.column(j):
             result_str = str(result) if result > 0 else " "
             table += f"{result_str:>8} | "
         table += "\n"
@@ -91,14 +105,47 @@ def format_results_table(teams: list, tasks: list, results: dict) -> str:
     return f"```\n{table}\n```"
 
 
-def get_team_task_result(results: dict, team_id: int, task_id: int) -> int:
+def format_team_results(matrix) -> str:
+    """Результаты по командам для /results (ненулевые баллы и итоги)"""
+    # Команды и задания в матрице уже отсортированы
+    totals = matrix.team_totals()
+    results_text = "📊 *Результаты команд:*"
+    for i, team in enumerate(matrix.teams):
+        results_text += f"\n🏢 *{team.name} (здание {team.building}):*\n"
+
+        for task, result in zip(matrix.tasks, matrix.row(i)):
+            if result > 0:
+                results_text += f"  • {task.subject}: "
+                results_text += f"{task.name} - {result} баллов\n"
+
+        results_text += f"  *Итого: {totals[i]} баллов*\n"
+    return results_text
+
+
+def format_scoreboard(matrix) -> str:
+    """Форматирование таблицы лидеров (команды по сумме баллов)"""
+    if not matrix.teams:
+        return "❌ Нет данных для отображения таблицы лидеров."
+
+    totals = sorted(
+        zip(matrix.team_totals(), matrix.ranks(), matrix.teams),
+        key=lambda x: (-x[0], x[2].name),
+    )
+
+    text = "🏆 *Таблица лидеров*\n\n"
+    for total, place, team in totals:
+        text += (
+            f"{place}. {team.name} (здание {team.building}) - "
+            f"{total}\n"
+        )
+    return text
+
+
+def get_team_task_result(
+    results: Results, team_id: int, task_id: int
+) -> int:
     """Получение результата команды для задания"""
-    if str(team_id) in results:
-        team_results = results[str(team_id)].get("results", [])
-        for result in team_results:
-            if result.get("taskInfo", {}).get("id") == task_id:
-                return result.get("result", 0)
-    return 0
+    return results.get((team_id, task_id), 0)
 
 
 def validate_name(name: str, legal_symbols: list) -> bool:
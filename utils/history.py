@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from api.cache import ResultChange
+from config.settings import HISTORY_DB_FILE
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_changes (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    team_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    old_value INTEGER,
+    new_value INTEGER NOT NULL,
+    user_id INTEGER,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_result_changes_team_ts
+    ON result_changes (team_id, ts);
+CREATE INDEX IF NOT EXISTS idx_result_changes_task_ts
+    ON result_changes (task_id, ts);
+"""
+
+
+class HistoryStore:
+    """Журнал изменений результатов в SQLite
+
+    Все обращения к базе выполняются в одном отдельном потоке, чтобы не
+    блокировать event loop. Выборки по команде и по заданию используют
+    индексы (team_id, ts) и (task_id, ts).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="history"
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.path, check_same_thread=False
+            )
+            self._connection.row_factory = sqlite3.Row
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _append(self, changes: List[ResultChange]):
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO result_changes (ts, team_id, task_id, "
+                "old_value, new_value, user_id, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        c.timestamp,
+                        c.team_id,
+                        c.task_id,
+                        c.old_value,
+                        c.new_value,
+                        c.user_id,
+                        c.source,
+                    )
+                    for c in changes
+                ],
+            )
+
+    def _query(self, column: str, value: int, limit: int) -> List[Dict]:
+        rows = self._connect().execute(
+            f"SELECT * FROM result_changes WHERE {column} = ? "
+            "ORDER BY ts DESC LIMIT ?",
+            (value, limit),
+        )
+        return [dict(row) for row in rows]
+
+    async def record(self, changes: List[ResultChange]):
+        """Запись изменений в журнал"""
+        try:
+            await self._run(self._append, changes)
+        except Exception as e:
+            logger.error(f"Ошибка записи истории результатов: {e}")
+
+    async def team_history(self, team_id: int, limit: int) -> List[Dict]:
+        """Последние изменения результатов команды"""
+        return await self._run(self._query, "team_id", team_id, limit)
+
+    async def task_history(self, task_id: int, limit: int) -> List[Dict]:
+        """Последние изменения результатов по заданию"""
+        return await self._run(self._query, "task_id", task_id, limit)
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def close(self):
+        """Завершение записи и закрытие базы"""
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+
+history_store = HistoryStore(HISTORY_DB_FILE)
@@ -0,0 +1,55 @@
+import logging
+from typing import Optional
+from aiohttp import web
+from utils.health import Check, health
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    """Отдача метрик в текстовом формате Prometheus"""
+    return web.Response(
+        body=metrics.render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+def _check_response(check: Check) -> web.Response:
+    ok, details = check
+    return web.json_response(
+        {"status": "ok" if ok else "fail", **details},
+        status=200 if ok else 503,
+    )
+
+
+async def handle_healthz(request: web.Request) -> web.Response:
+    """Живость: event loop отвечает, обновления Telegram получаются"""
+    return _check_response(health.liveness())
+
+
+async def handle_readyz(request: web.Request) -> web.Response:
+    """Готовность: токен API загружен, backend недавно отвечал"""
+    return _check_response(health.readiness())
+
+
+def create_app() -> web.Application:
+    """Создание веб-приложения со служебными эндпоинтами"""
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/healthz", handle_healthz)
+    app.router.add_get("/readyz", handle_readyz)
+    return app
+
+
+async def start_http_server(host: str, port: int) -> Optional[web.AppRunner]:
+    """Запуск локального HTTP сервера (port=0 отключает сервер)"""
+    if not port:
+        return None
+
+    runner = web.AppRunner(create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"HTTP сервер метрик запущен на {host}:{port}")
+    return runner
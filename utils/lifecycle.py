@@ -0,0 +1,72 @@
+import asyncio
+import itertools
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class InFlightTracker:
+    """Учет выполняющихся операций для корректного завершения работы
+
+    Операция привязывается к текущей asyncio задаче; при завершении бот
+    ждет эти задачи не дольше заданного времени.
+    """
+
+    def __init__(self):
+        self._operations: Dict[int, Tuple[str, Optional[asyncio.Task]]] = {}
+        self._ids = itertools.count()
+
+    @contextmanager
+    def track(self, description: str):
+        """Регистрация операции на время выполнения блока"""
+        op_id = next(self._ids)
+        self._operations[op_id] = (description, asyncio.current_task())
+        try:
+            yield
+        finally:
+            self._operations.pop(op_id, None)
+
+    def track_task(self, task: asyncio.Task, description: str):
+        """Регистрация фоновой задачи до ее завершения
+
+        Задача учитывается сразу, еще до начала выполнения, поэтому
+        запущенная перед остановкой работа не теряется.
+        """
+        op_id = next(self._ids)
+        self._operations[op_id] = (description, task)
+        task.add_done_callback(lambda _: self._operations.pop(op_id, None))
+
+    def pending(self) -> List[str]:
+        """Описания незавершенных операций"""
+        return [description for description, _ in self._operations.values()]
+
+    async def drain(self, timeout: float) -> List[str]:
+        """Ожидание завершения операций; возвращает брошенные операции
+
+        Операции, начатые во время ожидания (например, уведомления после
+        завершившейся записи), тоже дожидаются. Задачи, не успевшие
+        завершиться за timeout секунд, отменяются.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            tasks = self._tasks()
+            remaining = deadline - loop.time()
+            if not tasks or remaining <= 0:
+                break
+            await asyncio.wait(tasks, timeout=remaining)
+
+        abandoned = self.pending()
+        for task in self._tasks():
+            task.cancel()
+        return abandoned
+
+    def _tasks(self) -> Set[asyncio.Task]:
+        current = asyncio.current_task()
+        return {
+            task
+            for _, task in self._operations.values()
+            if task is not None and task is not current and not task.done()
+        }
+
+
+in_flight = InFlightTracker()
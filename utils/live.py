@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Set
+from aiogram import Bot
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+from api import api_client
+from api.cache import ResultChange
+from config.settings import LIVE_BOARDS_FILE, LIVE_EDIT_INTERVAL
+from utils.helpers import format_scoreboard, split_long_message
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+live_edits = metrics.counter(
+    "is57bot_live_board_edits_total",
+    "Обновления закрепленных таблиц лидеров",
+    ["result"],
+)
+
+
+class LiveBoardManager:
+    """Закрепленные таблицы лидеров, обновляемые при изменении результатов
+
+    В каждом чате есть не больше одного сообщения-таблицы. Изменения
+    результатов объединяются: сообщение редактируется не чаще раза в
+    interval секунд и только если текст таблицы изменился.
+    """
+
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = interval
+        self.bot: Optional[Bot] = None
+        self._boards: Dict[int, int] = {}  # chat_id -> message_id
+        self._last_text: Dict[int, str] = {}
+        self._last_edit: Dict[int, float] = {}
+        self._pending: Dict[int, asyncio.Task] = {}
+        self._dirty: Set[int] = set()
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_again = False
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._boards = {int(k): v for k, v in data.items()}
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить таблицы лидеров: {e}")
+
+    def _write(self, content: str):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    async def _save(self):
+        """Сохранение списка таблиц (записи идут по очереди, см.
+        SubscriptionManager._save)"""
+        self._save_again = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_loop())
+        await asyncio.shield(self._save_task)
+
+    async def _save_loop(self):
+        while self._save_again:
+            self._save_again = False
+            content = json.dumps(
+                {str(k): v for k, v in self._boards.items()}
+            )
+            try:
+                await asyncio.to_thread(self._write, content)
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить таблицы лидеров: {e}")
+
+    async def flush(self):
+        """Ожидание сохранения списка таблиц"""
+        if self._save_task is not None:
+            await self._save_task
+
+    @staticmethod
+    async def render() -> str:
+        """Текст таблицы лидеров по текущему снимку"""
+        matrix = await api_client.get_results_matrix()
+        return split_long_message(format_scoreboard(matrix))[0]
+
+    async def start(self, bot: Bot, chat_id: int) -> int:
+        """Публикация новой таблицы лидеров в чате (старая забывается)"""
+        self.bot = bot
+        text = await self.render()
+        message = await bot.send_message(
+            chat_id, text, parse_mode=ParseMode.MARKDOWN
+        )
+        try:
+            await bot.pin_chat_message(
+                chat_id, message.message_id, disable_notification=True
+            )
+        except TelegramAPIError as e:
+            logger.info(f"Не удалось закрепить таблицу в {chat_id}: {e}")
+
+        self._boards[chat_id] = message.message_id
+        self._last_text[chat_id] = text
+        self._last_edit[chat_id] = time.monotonic()
+        await self._save()
+        return message.message_id
+
+    async def stop(self, chat_id: int) -> bool:
+        """Прекращение обновления таблицы в чате"""
+        if chat_id not in self._boards:
+            return False
+        self._forget(chat_id)
+        await self._save()
+        return True
+
+    def _forget(self, chat_id: int):
+        self._boards.pop(chat_id, None)
+        self._last_text.pop(chat_id, None)
+        self._last_edit.pop(chat_id, None)
+        task = self._pending.pop(chat_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def on_results_changed(self, changes: List[ResultChange]):
+        """Обработчик изменений результатов из api_client"""
+        for chat_id in list(self._boards):
+            self.schedule(chat_id)
+
+    def schedule(self, chat_id: int):
+        """Запланировать обновление таблицы (повторные вызовы объединяются)"""
+        self._dirty.add(chat_id)
+        task = self._pending.get(chat_id)
+        if task is None or task.done():
+            self._pending[chat_id] = asyncio.create_task(
+                self._update_loop(chat_id)
+            )
+
+    async def _update_loop(self, chat_id: int):
+        while chat_id in self._dirty and chat_id in self._boards:
+            last_edit = self._last_edit.get(chat_id, 0.0)
+            delay = last_edit + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._dirty.discard(chat_id)
+            try:
+                await self._update(chat_id)
+            except Exception as e:
+                live_edits.inc(result="failed")
+                logger.error(f"Ошибка обновления таблицы в {chat_id}: {e}")
+
+    async def _update(self, chat_id: int):
+        text = await self.render()
+        if text == self._last_text.get(chat_id) or self.bot is None:
+            live_edits.inc(result="unchanged")
+            return
+
+        self._last_edit[chat_id] = time.monotonic()
+        try:
+            await self.bot.edit_message_text(
+                text,
+                chat_id=chat_id,
+                message_id=self._boards[chat_id],
+                parse_mode=ParseMode.MARKDOWN,
+            )
+        except TelegramBadRequest as e:
+            if "not modified" in str(e):
+                live_edits.inc(result="unchanged")
+            elif "not found" in str(e):
+                # Сообщение удалено - прекращаем обновлять таблицу
+                self._forget(chat_id)
+                await self._save()
+                live_edits.inc(result="failed")
+                return
+            else:
+                raise
+        else:
+            live_edits.inc(result="edited")
+        self._last_text[chat_id] = text
+
+
+live_boards = LiveBoardManager(LIVE_BOARDS_FILE, LIVE_EDIT_INTERVAL)
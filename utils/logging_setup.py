@@ -0,0 +1,157 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from config.settings import (
+    LOG_BACKUP_COUNT,
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_WHEN,
+    LOG_ROTATION,
+)
+
+TEXT_FORMAT = (
+    "%(asctime)s - %(name)s - %(levelname)s - %(correlation)s%(message)s"
+)
+
+# Идентификаторы текущего обновления Telegram (выставляются middleware)
+update_id_var: ContextVar[Optional[int]] = ContextVar(
+    "update_id", default=None
+)
+user_id_var: ContextVar[Optional[int]] = ContextVar("user_id", default=None)
+
+
+class ContextFilter(logging.Filter):
+    """Добавление update_id/user_id текущего обновления в записи лога"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        update_id = update_id_var.get()
+        user_id = user_id_var.get()
+        record.update_id = update_id
+        record.user_id = user_id
+        if update_id is None and user_id is None:
+            record.correlation = ""
+        else:
+            record.correlation = f"[{update_id}:{user_id}] "
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Пропуск только каждой N-й DEBUG записи с одного места в коде"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counters: Dict[Tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG:
+            return True
+        if not self.every:
+            return False
+        key = (record.name, record.lineno)
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        return count % self.every == 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, сохраняющий traceback отдельно от текста сообщения"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записей лога в JSON (одна строка на запись)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(
+                record.created, tz=timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("update_id", "user_id"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _create_file_handler() -> logging.Handler:
+    """Файловый обработчик с ротацией по размеру или по времени"""
+    if LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE,
+            when=LOG_ROTATE_WHEN,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+    return logging.handlers.RotatingFileHandler(
+        LOG_FILE,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Настройка неблокирующего логирования через очередь
+
+    Обработчики пишут в консоль и файл в отдельном потоке
+    QueueListener, поэтому запись лога не блокирует event loop.
+    Возвращает запущенный listener, который нужно остановить при выходе.
+    """
+    if LOG_FORMAT == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler = _create_file_handler()
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
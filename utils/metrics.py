@@ -0,0 +1,350 @@
+import bisect
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape_label(value: str) -> str:
+    """Экранирование значения метки для текстового формата Prometheus"""
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _format_labels(
+    names: Sequence[str], values: Sequence[str], extra: str = ""
+) -> str:
+    """Форматирование набора меток вида {a="1",b="2"}"""
+    pairs = [
+        f'{name}="{_escape_label(value)}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Форматирование числа для текстового формата Prometheus"""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Базовый класс метрики с набором меток"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Преобразование меток в ключ хранения"""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Сериализация метрики в текстовый формат Prometheus"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        return sorted(self._values.items())
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in self.items():
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Значение, которое может как расти, так и уменьшаться"""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Гистограмма распределения значений (обычно длительностей)"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        # ключ -> [счетчики по корзинам, сумма, количество]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = [[0] * len(self.buckets), 0.0, 0]
+            self._values[key] = state
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Контекстный менеджер для измерения длительности блока"""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def label_values(self) -> List[Tuple[str, ...]]:
+        return sorted(self._values)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Оценка квантиля по корзинам (линейная интерполяция)"""
+        state = self._values.get(self._key(labels))
+        if not state or not state[2]:
+            return None
+        rank = q * state[2]
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, state[0]):
+            if cumulative + count >= rank and count:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            if bound != math.inf:
+                lower = bound
+        return lower
+
+    def _samples(self) -> Iterable[str]:
+        for key in self.label_values():
+            counts, total, count = self._values[key]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"'
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class _Timer:
+    """Измерение длительности блока кода для гистограммы"""
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Реестр метрик бота с выводом в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        return self._register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате exposition format 0.0.4"""
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# Обработчики команд
+handler_latency = metrics.histogram(
+    "is57bot_handler_duration_seconds",
+    "Время выполнения обработчиков команд",
+    ["handler"],
+)
+handler_errors = metrics.counter(
+    "is57bot_handler_errors_total",
+    "Необработанные исключения в обработчиках команд",
+    ["handler"],
+)
+updates_in_flight = metrics.gauge(
+    "is57bot_updates_in_flight",
+    "Количество обновлений Telegram в обработке",
+)
+updates_total = metrics.counter(
+    "is57bot_updates_total",
+    "Количество полученных обновлений Telegram",
+)
+
+# Запросы к backend is57.ru
+backend_latency = metrics.histogram(
+    "is57bot_backend_request_duration_seconds",
+    "Время выполнения запросов к API is57.ru",
+    ["endpoint"],
+)
+backend_errors = metrics.counter(
+    "is57bot_backend_errors_total",
+    "Ошибки запросов к API is57.ru",
+    ["endpoint", "reason"],
+)
+backend_invalid_token = metrics.counter(
+    "is57bot_backend_invalid_token_total",
+    "Ответы 'invalid token' от API is57.ru",
+    ["endpoint"],
+)
+
+# Кэши
+cache_requests = metrics.counter(
+    "is57bot_cache_requests_total",
+    "Обращения к кэшам бота",
+    ["cache", "result"],
+)
+
+
+def record_cache_access(cache: str, hit: bool):
+    """Учет попадания или промаха кэша"""
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def cache_hit_ratios() -> Dict[str, float]:
+    """Доля попаданий для каждого кэша"""
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in cache_requests.items():
+        hits_total = totals.setdefault(cache, [0, 0])
+        if result == "hit":
+            hits_total[0] += value
+        hits_total[1] += value
+    return {
+        cache: hits / total
+        for cache, (hits, total) in totals.items()
+        if total
+    }
+
+
+def format_status_summary() -> str:
+    """Краткая сводка метрик для команды /status"""
+    lines = [
+        f"**Обновлений в обработке:** {int(updates_in_flight.value())}",
+        f"**Обновлений всего:** {int(updates_total.value())}",
+    ]
+
+    handler_lines = []
+    for (handler,) in handler_latency.label_values():
+        p95 = handler_latency.quantile(0.95, handler=handler)
+        errors = int(handler_errors.value(handler=handler))
+        handler_lines.append(
+            f"`{handler}`: {handler_latency.count(handler=handler)} шт., "
+            f"p95 {p95 * 1000:.0f} мс, ошибок {errors}"
+        )
+    if handler_lines:
+        lines.append("\n**Обработчики:**")
+        lines.extend(handler_lines)
+
+    backend_lines = []
+    for (endpoint,) in backend_latency.label_values():
+        p95 = backend_latency.quantile(0.95, endpoint=endpoint)
+        errors = sum(
+            value
+            for (ep, _), value in backend_errors.items()
+            if ep == endpoint
+        )
+        backend_lines.append(
+            f"`{endpoint}`: {backend_latency.count(endpoint=endpoint)} шт., "
+            f"p95 {p95 * 1000:.0f} мс, ошибок {int(errors)}"
+        )
+    if backend_lines:
+        lines.append("\n**Запросы к API:**")
+        lines.extend(backend_lines)
+
+    invalid_token = sum(value for _, value in backend_invalid_token.items())
+    if invalid_token:
+        lines.append(f"**Ответов 'invalid token':** {int(invalid_token)}")
+
+    ratios = cache_hit_ratios()
+    if ratios:
+        lines.append("\n**Попадания в кэш:**")
+        lines.extend(
+            f"`{cache}`: {ratio * 100:.0f}%"
+            for cache, ratio in sorted(ratios.items())
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,105 @@
+from typing import Dict, Optional, Tuple
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from api.models import TaskIndex
+from config.settings import PICKER_TASKS_PER_PAGE
+from utils.metrics import record_cache_access
+
+# Callback data кнопок выбора задания (64 байта максимум):
+#   ct:s - список предметов, ct:s:<страница>:<предмет> - задания
+#   предмета (название последним: в нем может быть двоеточие),
+#   ct:t:<id> - выбор задания
+PICKER_CALLBACK = "ct"
+# Сколько байт названия предмета помещается в callback data
+SUBJECT_KEY_BYTES = 48
+
+Screen = Tuple[str, InlineKeyboardMarkup]
+
+
+def _button(text: str, *parts) -> InlineKeyboardButton:
+    return InlineKeyboardButton(
+        text=text, callback_data=":".join((PICKER_CALLBACK, *map(str, parts)))
+    )
+
+
+def subject_key(subject: str) -> str:
+    """Название предмета для callback data (длинное - обрезается)"""
+    return subject.encode()[:SUBJECT_KEY_BYTES].decode(errors="ignore")
+
+
+def find_subject(index: TaskIndex, key: str) -> Optional[str]:
+    """Предмет индекса по названию из callback data
+
+    Кнопки ссылаются на предмет по названию, а не по номеру, поэтому
+    после смены снимка /tasks нажатие не откроет другой предмет. None -
+    предмета больше нет (или обрезанное название неоднозначно).
+    """
+    matches = [s for s in index.subjects if subject_key(s) == key]
+    return matches[0] if len(matches) == 1 else None
+
+
+class TaskPicker:
+    """Клавиатуры выбора задания для /choose_task: предмет -> задание
+
+    Клавиатуры строятся по индексу заданий при первом обращении и
+    хранятся, пока не сменится снимок /tasks (объект индекса).
+    """
+
+    def __init__(self, tasks_per_page: int):
+        self.tasks_per_page = tasks_per_page
+        self._index: Optional[TaskIndex] = None
+        self._screens: Dict[Tuple, Screen] = {}
+
+    def _screen(self, index: TaskIndex, key: Tuple, build) -> Screen:
+        if index is not self._index:
+            self._index = index
+            self._screens = {}
+        screen = self._screens.get(key)
+        record_cache_access("task_picker", screen is not None)
+        if screen is None:
+            screen = self._screens[key] = build()
+        return screen
+
+    def subjects(self, index: TaskIndex) -> Screen:
+        """Список предметов"""
+
+        def build():
+            rows = []
+            for subject in index.subjects:
+                label = f"📚 {subject} ({len(index.by_subject[subject])})"
+                rows.append([_button(label, "s", 0, subject_key(subject))])
+            return (
+                "📝 Выберите предмет:",
+                InlineKeyboardMarkup(inline_keyboard=rows),
+            )
+
+        return self._screen(index, ("s",), build)
+
+    def tasks(self, index: TaskIndex, subject: str, page: int) -> Screen:
+        """Задания предмета subject (по страницам)"""
+        tasks = index.by_subject[subject]
+        key = subject_key(subject)
+        pages = max(1, -(-len(tasks) // self.tasks_per_page))
+        page = min(max(page, 0), pages - 1)
+
+        def build():
+            start = page * self.tasks_per_page
+            rows = [
+                [_button(task.name, "t", task.id)]
+                for task in tasks[start:start + self.tasks_per_page]
+            ]
+            navigation = []
+            if page > 0:
+                navigation.append(_button("⬅️", "s", page - 1, key))
+            navigation.append(_button("↩️ Предметы", "s"))
+            if page < pages - 1:
+                navigation.append(_button("➡️", "s", page + 1, key))
+            rows.append(navigation)
+            text = f"📝 {subject}: выберите задание"
+            if pages > 1:
+                text += f" (страница {page + 1} из {pages})"
+            return text, InlineKeyboardMarkup(inline_keyboard=rows)
+
+        return self._screen(index, ("s", subject, page), build)
+
+
+task_picker = TaskPicker(PICKER_TASKS_PER_PAGE)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _Counter
+from typing import Optional
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+loop_lag = metrics.histogram(
+    "is57bot_event_loop_lag_seconds",
+    "Опоздание запланированных колбэков event loop",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+loop_stalls = metrics.counter(
+    "is57bot_event_loop_stalls_total",
+    "Блокировки event loop дольше порога",
+)
+
+
+class LoopLagMonitor:
+    """Измерение задержки event loop и поиск блокирующих колбэков
+
+    Задача в event loop раз в interval секунд засыпает и измеряет,
+    насколько позже срока она проснулась. Отдельный поток-наблюдатель
+    проверяет, что задача регулярно просыпается; если loop занят дольше
+    threshold секунд, в лог пишется стек потока event loop.
+    """
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        # Последнее измеренное опоздание (для /healthz)
+        self.last_lag = 0.0
+
+    @property
+    def heartbeat_age(self) -> float:
+        """Сколько секунд назад измерительная задача просыпалась"""
+        return time.monotonic() - self._heartbeat
+
+    def start(self):
+        """Запуск измерений (вызывать внутри работающего event loop)"""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self):
+        """Остановка измерений"""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            loop_lag.observe(self.last_lag)
+            self._heartbeat = time.monotonic()
+
+    def _watch(self):
+        reported = False
+        while not self._stopped.wait(self.threshold / 2):
+            stalled_for = time.monotonic() - self._heartbeat - self.interval
+            if stalled_for < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            loop_stalls.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            logger.warning(
+                f"Event loop заблокирован дольше {stalled_for:.2f}s:\n{stack}"
+            )
+
+
+def _frame_label(code) -> str:
+    """Подпись функции для отчета профилировщика"""
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик потока event loop
+
+    Раз в interval секунд снимает стек потока thread_id и считает,
+    сколько раз каждая функция была на вершине стека (собственное время)
+    и сколько раз встречалась в стеке вообще (общее время).
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.own: _Counter = _Counter()
+        self.total: _Counter = _Counter()
+
+    def run(self, duration: float):
+        """Сбор сэмплов в течение duration секунд (блокирующий вызов)"""
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame):
+        self.samples += 1
+        self.own[_frame_label(frame.f_code)] += 1
+        seen = set()
+        while frame is not None:
+            label = _frame_label(frame.f_code)
+            if label not in seen:
+                seen.add(label)
+                self.total[label] += 1
+            frame = frame.f_back
+
+    def report(self, top_n: int) -> str:
+        """Текстовый отчет с top_n самых горячих функций"""
+        lines = [f"Сэмплов: {self.samples}, интервал {self.interval}s", ""]
+        for title, counter in (
+            ("Собственное время", self.own),
+            ("Общее время (с вложенными вызовами)", self.total),
+        ):
+            lines.append(f"{title}:")
+            for label, count in counter.most_common(top_n):
+                share = count / self.samples * 100 if self.samples else 0
+                lines.append(f"{share:6.1f}% {count:7d}  {label}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+async def profile_event_loop(
+    duration: float, interval: float, top_n: int
+) -> str:
+    """Профилирование текущего event loop на живом трафике"""
+    profiler = SamplingProfiler(threading.get_ident(), interval)
+    await asyncio.get_running_loop().run_in_executor(
+        None, profiler.run, duration
+    )
+    return profiler.report(top_n)
@@ -1,7 +1,18 @@
+import asyncio
+import itertools
 import json
 import os
-from typing import Optional, Dict
-from config.settings import SELECTED_TASKS_FILE, DATA_DIR
+import time
+from typing import Any, Dict, Optional, Tuple
+from api.models import Task
+from config.settings import (
+    DATA_DIR,
+    SELECTED_TASKS_FILE,
+    SELECTION_IDLE_TIMEOUT,
+)
+
+# How long (seconds) score lines wait for confirmation
+CONFIRM_TTL = 600
 
 
 class SelectionManager:
@@ -13,9 +24,13 @@ class SelectionManager:
             "task_id": 123,
             "subject": "математика",
             "name": "Задание 1",
+            "used_at": 1700000000.0,
         },
         ...
     }
+
+    A selection that has not been used for SELECTION_IDLE_TIMEOUT
+    seconds is treated as absent.
     """
 
     def __init__(self):
@@ -23,6 +38,8 @@ class SelectionManager:
             os.makedirs(DATA_DIR)
         self.path = SELECTED_TASKS_FILE
         self._data: Dict[str, Dict] = {}
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_again = False
         self._load()
 
     def _load(self):
@@ -32,24 +49,66 @@ class SelectionManager:
                     self._data = json.load(f)
         except Exception:
             self._data = {}
+        # Selections saved without a timestamp count as just used
+        now = time.time()
+        for sel in self._data.values():
+            sel.setdefault("used_at", now)
 
-    def _save(self):
+    def _write(self, content: str):
         try:
             with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+                f.write(content)
         except Exception:
             pass
 
-    def set_selection(self, user_id: int, task: Dict):
+    def _save(self):
+        """Schedule a write in a worker thread so the event loop never
+        blocks on disk; writes requested while one is running are merged.
+        """
+        if self._save_task is not None and not self._save_task.done():
+            self._save_again = True
+            return
+        self._save_task = asyncio.create_task(self._save_loop())
+
+    async def _save_loop(self):
+        self._save_again = True
+        while self._save_again:
+            self._save_again = False
+            content = json.dumps(self._data, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(self._write, content)
+
+    async def flush(self):
+        """Wait until pending writes reach the disk."""
+        if self._save_task is not None:
+            await self._save_task
+
+    def set_selection(self, user_id: int, task: Task):
         self._data[str(user_id)] = {
-            "task_id": task.get("id"),
-            "subject": task.get("subject"),
-            "name": task.get("name"),
+            "task_id": task.id,
+            "subject": task.subject,
+            "name": task.name,
+            "used_at": time.time(),
         }
         self._save()
 
     def get_selection(self, user_id: int) -> Optional[Dict]:
-        return self._data.get(str(user_id))
+        sel = self._data.get(str(user_id))
+        if sel is None or self._expired(sel):
+            return None
+        return sel
+
+    def touch(self, user_id: int):
+        """Restart the idle timeout after the selection was used."""
+        sel = self.get_selection(user_id)
+        if sel is not None:
+            sel["used_at"] = time.time()
+            self._save()
+
+    @staticmethod
+    def _expired(sel: Dict) -> bool:
+        if SELECTION_IDLE_TIMEOUT <= 0:
+            return False
+        return time.time() - sel["used_at"] > SELECTION_IDLE_TIMEOUT
 
     def clear_selection(self, user_id: int):
         if str(user_id) in self._data:
@@ -57,4 +116,39 @@ class SelectionManager:
             self._save()
 
 
+class PendingScores:
+    """Score lines waiting for the user's confirmation.
+
+    Each entry gets a short numeric id for callback data and is dropped
+    after ttl seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._ids = itertools.count(1)
+        self._items: Dict[int, Tuple[float, int, Any]] = {}
+
+    def add(self, user_id: int, payload: Any) -> int:
+        now = time.time()
+        self._items = {
+            key: item
+            for key, item in self._items.items()
+            if now - item[0] <= self.ttl
+        }
+        key = next(self._ids)
+        self._items[key] = (now, user_id, payload)
+        return key
+
+    def pop(self, key: int, user_id: int) -> Optional[Any]:
+        """Take the entry if it belongs to user_id and has not expired."""
+        item = self._items.get(key)
+        if item is None or item[1] != user_id:
+            return None
+        del self._items[key]
+        if time.time() - item[0] > self.ttl:
+            return None
+        return item[2]
+
+
 selection_manager = SelectionManager()
+pending_scores = PendingScores(CONFIRM_TTL)
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from asyncio_throttle import Throttler
+from api import api_client
+from api.cache import ResultChange
+from config.settings import (
+    SUBSCRIPTIONS_FILE,
+    SUBSCRIPTION_BATCH_WINDOW,
+    SUBSCRIPTION_SEND_RATE,
+)
+from utils.helpers import split_long_message
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+notifications_sent = metrics.counter(
+    "is57bot_notifications_sent_total",
+    "Уведомления об изменениях результатов",
+    ["result"],
+)
+notifications_queued = metrics.gauge(
+    "is57bot_notifications_queued",
+    "Уведомления в очереди на отправку",
+)
+
+
+class RateLimitedSender:
+    """Очередь исходящих сообщений с ограничением частоты отправки"""
+
+    def __init__(self, rate_limit: int):
+        self.bot: Optional[Bot] = None
+        self._throttler = Throttler(rate_limit=rate_limit, period=1.0)
+        self._queue: "asyncio.Queue[Tuple[int, str]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    def send(self, chat_id: int, text: str):
+        """Постановка сообщения в очередь"""
+        self._queue.put_nowait((chat_id, text))
+        notifications_queued.set(self._queue.qsize())
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._queue.empty():
+            chat_id, text = await self._queue.get()
+            notifications_queued.set(self._queue.qsize())
+            async with self._throttler:
+                await self._deliver(chat_id, text)
+
+    async def _deliver(self, chat_id: int, text: str):
+        if self.bot is None:
+            notifications_sent.inc(result="failed")
+            return
+        try:
+            await self.bot.send_message(chat_id, text, parse_mode=None)
+            notifications_sent.inc(result="sent")
+        except TelegramRetryAfter as e:
+            # Telegram просит подождать - повторяем после паузы
+            await asyncio.sleep(e.retry_after)
+            await self._deliver(chat_id, text)
+        except TelegramAPIError as e:
+            notifications_sent.inc(result="failed")
+            logger.warning(f"Не удалось отправить уведомление {chat_id}: {e}")
+
+
+class SubscriptionManager:
+    """Подписки чатов на изменения результатов
+
+    Подписка бывает на все изменения, на команду (по ID) или на предмет.
+    Изменения для чата копятся window секунд и отправляются одним
+    сообщением через общую очередь с ограничением частоты.
+    """
+
+    def __init__(self, path: str, window: float, sender: RateLimitedSender):
+        self.path = path
+        self.window = window
+        self.sender = sender
+        # chat_id -> список фильтров {"type": all|team|subject, "value": ...}
+        self._subscriptions: Dict[int, List[Dict]] = {}
+        self._buffers: Dict[int, List[ResultChange]] = {}
+        self._flush_tasks: Dict[int, asyncio.Task] = {}
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_again = False
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._subscriptions = {int(k): v for k, v in data.items()}
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить подписки: {e}")
+
+    def _write(self, content: str):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    async def _save(self):
+        """Запись на диск одной фоновой задачей
+
+        Изменения, сделанные во время записи, попадают в следующий
+        проход, поэтому на диске всегда оказывается последнее состояние.
+        """
+        self._save_again = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_loop())
+        # Отмена обработчика не должна прерывать запись
+        await asyncio.shield(self._save_task)
+
+    async def _save_loop(self):
+        while self._save_again:
+            self._save_again = False
+            content = json.dumps(
+                {str(k): v for k, v in self._subscriptions.items()},
+                ensure_ascii=False,
+            )
+            try:
+                await asyncio.to_thread(self._write, content)
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить подписки: {e}")
+
+    async def flush(self):
+        """Ожидание записи изменений на диск"""
+        if self._save_task is not None:
+            await self._save_task
+
+    async def subscribe(self, chat_id: int, kind: str, value=None) -> bool:
+        """Добавление подписки (False - такая подписка уже есть)"""
+        filters = self._subscriptions.setdefault(chat_id, [])
+        entry = {"type": kind, "value": value}
+        if entry in filters:
+            return False
+        filters.append(entry)
+        await self._save()
+        return True
+
+    async def unsubscribe(self, chat_id: int, kind=None, value=None) -> bool:
+        """Удаление подписки (без kind - всех подписок чата)"""
+        filters = self._subscriptions.get(chat_id)
+        if not filters:
+            return False
+        if kind is None:
+            del self._subscriptions[chat_id]
+        else:
+            entry = {"type": kind, "value": value}
+            if entry not in filters:
+                return False
+            filters.remove(entry)
+            if not filters:
+                del self._subscriptions[chat_id]
+        await self._save()
+        return True
+
+    @staticmethod
+    def _matches(filters: List[Dict], change: ResultChange, subject) -> bool:
+        for entry in filters:
+            if entry["type"] == "all":
+                return True
+            if entry["type"] == "team" and entry["value"] == change.team_id:
+                return True
+            if entry["type"] == "subject" and entry["value"] == subject:
+                return True
+        return False
+
+    async def on_results_changed(self, changes: List[ResultChange]):
+        """Обработчик изменений результатов из api_client"""
+        if not self._subscriptions:
+            return
+
+        tasks = await api_client.get_tasks()
+        subjects = {task.id: task.subject for task in tasks}
+        for chat_id, filters in self._subscriptions.items():
+            matching = [
+                change
+                for change in changes
+                if self._matches(
+                    filters, change, subjects.get(change.task_id)
+                )
+            ]
+            if not matching:
+                continue
+            self._buffers.setdefault(chat_id, []).extend(matching)
+            task = self._flush_tasks.get(chat_id)
+            if task is None or task.done():
+                self._flush_tasks[chat_id] = asyncio.create_task(
+                    self._flush_later(chat_id)
+                )
+
+    async def _flush_later(self, chat_id: int):
+        await asyncio.sleep(self.window)
+        changes = self._buffers.pop(chat_id, [])
+        text = await self.format_changes(changes) if changes else ""
+        if not text:
+            return
+        for part in split_long_message(text):
+            self.sender.send(chat_id, part)
+
+    @staticmethod
+    async def format_changes(changes: List[ResultChange]) -> str:
+        """Текст уведомления; повторные изменения ячейки объединяются"""
+        teams = await api_client.get_teams()
+        tasks = await api_client.get_tasks()
+        team_names = {team.id: team.name for team in teams}
+        task_names = {
+            task.id: f"{task.name} ({task.subject})"
+            for task in tasks
+        }
+
+        # Для каждой ячейки - первое старое и последнее новое значение
+        cells: Dict[Tuple[int, int], List] = {}
+        for change in changes:
+            key = (change.team_id, change.task_id)
+            if key in cells:
+                cells[key][1] = change.new_value
+            else:
+                cells[key] = [change.old_value, change.new_value]
+
+        lines = ["🔔 Изменения результатов:"]
+        for (team_id, task_id), (old_value, new_value) in cells.items():
+            if old_value == new_value:
+                continue
+            old_text = "?" if old_value is None else old_value
+            lines.append(
+                f"• {team_names.get(team_id, team_id)} - "
+                f"{task_names.get(task_id, task_id)}: "
+                f"{old_text} → {new_value}"
+            )
+        return "\n".join(lines) if len(lines) > 1 else ""
+
+
+notification_sender = RateLimitedSender(SUBSCRIPTION_SEND_RATE)
+subscription_manager = SubscriptionManager(
+    SUBSCRIPTIONS_FILE, SUBSCRIPTION_BATCH_WINDOW, notification_sender
+)
@@ -0,0 +1,138 @@
+from html import escape
+from typing import Dict, List, Optional, Tuple
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from api.matrix import ResultsMatrix
+from config.settings import TABLE_TASKS_PER_PAGE, TABLE_TEAMS_PER_PAGE
+from utils.metrics import record_cache_access
+
+# Префикс callback data кнопок листания /table
+TABLE_CALLBACK = "table"
+# Ширина столбца с названием команды и столбцов с баллами
+NAME_WIDTH = 16
+VALUE_WIDTH = 4
+
+Page = Tuple[str, InlineKeyboardMarkup]
+
+
+def _cut(text: str, width: int) -> str:
+    return text if len(text) <= width else text[: width - 1] + "…"
+
+
+class TablePages:
+    """Страницы таблицы результатов /table
+
+    Страница - окно из teams_per_page команд (строки) и не больше
+    tasks_per_page заданий одного предмета (столбцы). Страницы строятся
+    при первом обращении и хранятся, пока не сменится матрица
+    результатов, поэтому листание не обращается к backend.
+    """
+
+    def __init__(self, teams_per_page: int, tasks_per_page: int):
+        self.teams_per_page = teams_per_page
+        self.tasks_per_page = tasks_per_page
+        self._matrix: Optional[ResultsMatrix] = None
+        # Окна заданий: (предмет, начало, конец) в столбцах матрицы
+        self._task_windows: List[Tuple[str, int, int]] = []
+        self._pages: Dict[Tuple[int, int], Page] = {}
+
+    def _reset(self, matrix: ResultsMatrix):
+        self._matrix = matrix
+        self._pages = {}
+        self._task_windows = [
+            (subject, start, min(start + self.tasks_per_page, end))
+            for subject, (first, end) in matrix.subject_slices.items()
+            for start in range(first, end, self.tasks_per_page)
+        ]
+
+    def team_pages(self) -> int:
+        n_teams = self._matrix.n_teams
+        return max(1, -(-n_teams // self.teams_per_page))
+
+    def page(
+        self, matrix: ResultsMatrix, team_page: int, task_page: int
+    ) -> Page:
+        """Текст и клавиатура страницы (номера страниц с нуля)"""
+        if matrix is not self._matrix:
+            self._reset(matrix)
+        team_page = min(max(team_page, 0), self.team_pages() - 1)
+        task_page = min(max(task_page, 0), len(self._task_windows) - 1)
+
+        key = (team_page, task_page)
+        page = self._pages.get(key)
+        record_cache_access("table_pages", page is not None)
+        if page is None:
+            page = self._pages[key] = (
+                self._render(team_page, task_page),
+                self._keyboard(team_page, task_page),
+            )
+        return page
+
+    def _render(self, team_page: int, task_page: int) -> str:
+        matrix = self._matrix
+        subject, start, end = self._task_windows[task_page]
+        first, last = matrix.subject_slices[subject]
+        team_start = team_page * self.teams_per_page
+        team_end = min(team_start + self.teams_per_page, matrix.n_teams)
+        subject_totals = matrix.team_totals((first, last))
+
+        header = f"{'Команда':<{NAME_WIDTH}}" + "".join(
+            f"{j - first + 1:>{VALUE_WIDTH}}" for j in range(start, end)
+        )
+        lines = [header + f"{'Σ':>{VALUE_WIDTH + 1}}"]
+        for i in range(team_start, team_end):
+            values = matrix.row(i)[start:end]
+            filled = matrix.filled_row(i)[start:end]
+            cells = "".join(
+                f"{value if is_filled else '.':>{VALUE_WIDTH}}"
+                for value, is_filled in zip(values, filled)
+            )
+            name = _cut(matrix.teams[i].name, NAME_WIDTH - 1)
+            lines.append(
+                f"{name:<{NAME_WIDTH}}{cells}"
+                f"{subject_totals[i]:>{VALUE_WIDTH + 1}}"
+            )
+
+        legend = [
+            f"{j - first + 1}. {escape(matrix.tasks[j].name)}"
+            for j in range(start, end)
+        ]
+        return "\n".join(
+            [
+                f"📊 <b>Таблица результатов: {escape(subject)}</b>",
+                f"Задания {start - first + 1}-{end - first} из "
+                f"{last - first}, команды {team_start + 1}-{team_end} "
+                f"из {matrix.n_teams}",
+                "",
+                "<pre>" + escape("\n".join(lines)) + "</pre>",
+                *legend,
+            ]
+        )
+
+    def _keyboard(
+        self, team_page: int, task_page: int
+    ) -> InlineKeyboardMarkup:
+        def button(text: str, teams: int, tasks: int):
+            return InlineKeyboardButton(
+                text=text, callback_data=f"{TABLE_CALLBACK}:{teams}:{tasks}"
+            )
+
+        teams_row = []
+        if team_page > 0:
+            teams_row.append(button("⬅️ Команды", team_page - 1, task_page))
+        if team_page < self.team_pages() - 1:
+            teams_row.append(button("Команды ➡️", team_page + 1, task_page))
+
+        tasks_row = []
+        if task_page > 0:
+            subject = self._task_windows[task_page - 1][0]
+            tasks_row.append(button(f"⬅️ {subject}", team_page, task_page - 1))
+        if task_page < len(self._task_windows) - 1:
+            subject = self._task_windows[task_page + 1][0]
+            tasks_row.append(button(f"{subject} ➡️", team_page, task_page + 1))
+
+        return InlineKeyboardMarkup(
+            inline_keyboard=[row for row in (teams_row, tasks_row) if row]
+        )
+
+
+table_pages = TablePages(TABLE_TEAMS_PER_PAGE, TABLE_TASKS_PER_PAGE)
@@ -0,0 +1,146 @@
+import gzip
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Union
+
+
+# Команды администратора: их аргументы в трассу не записываются
+REDACTED_COMMANDS = frozenset(
+    {
+        "set_token",
+        "add_user",
+        "remove_user",
+        "add_group",
+        "remove_group",
+        "status",
+        "profile",
+    }
+)
+REDACTED = "[скрыто]"
+
+
+def redact_update(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Замена аргументов команд администратора в обновлении (на месте)"""
+    for key in ("message", "edited_message"):
+        message = update.get(key)
+        text = message.get("text") if message else None
+        if not text or not text.startswith("/"):
+            continue
+        command, *args = text.split(maxsplit=1)
+        if not args:
+            continue
+        if command[1:].split("@")[0].lower() in REDACTED_COMMANDS:
+            message["text"] = f"{command} {REDACTED}"
+            # Разметка аргументов (ссылки и т.п.) тоже содержит их текст
+            message["entities"] = [
+                entity
+                for entity in message.get("entities", [])
+                if entity["offset"] + entity["length"] <= len(command)
+            ]
+    return update
+
+
+class TraceRecorder:
+    """Запись трассы реального трафика для replay.py
+
+    В сжатый JSONL файл пишутся входящие обновления Telegram и ответы
+    backend с временем от начала записи. Запись на диск идет в отдельном
+    потоке, обработчики только кладут записи в очередь. Токен API из
+    параметров запросов и аргументы команд администратора (в том числе
+    токен из /set_token) в трассу не попадают.
+    """
+
+    def __init__(self):
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._queue is not None
+
+    def start(self, path: str, **meta):
+        """Начало записи в path (файл перезаписывается)"""
+        self._queue = queue.SimpleQueue()
+        self._start = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._write,
+            args=(path, self._queue),
+            name="trace-writer",
+            daemon=True,
+        )
+        self._thread.start()
+        self._put("meta", **meta)
+
+    def stop(self):
+        """Завершение записи и закрытие файла"""
+        if self._queue is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._queue = None
+        self._thread = None
+
+    def _put(self, kind: str, **fields):
+        self._queue.put(
+            {
+                "t": round(time.monotonic() - self._start, 6),
+                "type": kind,
+                **fields,
+            }
+        )
+
+    def record_update(self, update: Dict[str, Any]):
+        """Входящее обновление Telegram (в формате Bot API)"""
+        if self._queue is not None:
+            self._put("update", update=redact_update(update))
+
+    def record_backend(
+        self,
+        endpoint: str,
+        params: Optional[Dict],
+        status: int,
+        content_type: str,
+        body: Union[bytes, str, None],
+        latency: float,
+    ):
+        """Ответ backend на запрос endpoint (body - None без тела)"""
+        if self._queue is None:
+            return
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        self._put(
+            "backend",
+            endpoint=endpoint,
+            params={
+                name: value
+                for name, value in (params or {}).items()
+                if name != "token"
+            },
+            status=status,
+            content_type=content_type,
+            body=body,
+            latency=round(latency, 6),
+        )
+
+    @staticmethod
+    def _write(path: str, records: queue.SimpleQueue):
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            while True:
+                record = records.get()
+                if record is None:
+                    break
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """Чтение записей трассы по порядку"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+trace_recorder = TraceRecorder()